@@ -0,0 +1,216 @@
+"""
+Implements a renderer for animations of spectrograms along the propagation.
+
+Frames are drawn by `SpectrogramFrames`, which builds the figure of
+`spectrogram.plot_spectrogram` once and, for each subsequent frame, only
+replaces the image data and the :math:`z`-label. Since the spectrogram is
+normalized to unit maximum per frame, color scale and colorbar are the same
+for all frames. `render_spectrograms` distributes the frames over a pool of
+worker processes, each holding its own figure, and either writes them to
+disk as PNG files or passes them in order to a video encoder reading raw
+frames from a pipe, e.g. ffmpeg.
+
+Example:
+    Spectrograms of every 6th stored state, encoded as movie::
+
+        z_ids = range(0, z.size, 6)
+        t_S, w_S, P_ztw = batch_spectrogram(t, w, utz, z_ids, s0=1.0, cutoff=6.0)
+        render_spectrograms(z[z_ids], t_S, w_S, P_ztw, movie="spec.mp4")
+"""
+import shlex
+import subprocess
+import multiprocessing as mp
+import numpy as np
+import matplotlib as mpl
+import matplotlib.image
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from .spectrogram import _draw_spectrogram, _normalize_spectrogram
+
+# -- DEFAULT ENCODER: RAW RGBA FRAMES FROM STDIN, PADDED TO EVEN SIZE
+_FFMPEG = (
+    "ffmpeg -y -loglevel error -f rawvideo -pix_fmt rgba -s {width}x{height}"
+    " -r {fps} -i - -vf pad=ceil(iw/2)*2:ceil(ih/2)*2 -pix_fmt yuv420p {movie}"
+)
+
+# -- RENDERER CONFIGURATION, INHERITED BY EACH WORKER PROCESS
+_RENDER = None
+
+
+class SpectrogramFrames:
+    r"""Figure of `plot_spectrogram`, reused for a sequence of frames.
+
+    Args:
+        t_delay (:obj:`numpy.ndarray`, 1-dim): Delay time grid.
+        w_opt (:obj:`numpy.ndarray`, 1-dim): Angular-frequency grid.
+        t_lim (:obj:`tuple`): Delay time range shown (default: None, i.e.
+            full range).
+        w_lim (:obj:`tuple`): Angular-frequency range shown (default: None,
+            i.e. full range).
+        dpi (:obj:`int`): Resolution of the frames (default: 600, as used by
+            `plot_spectrogram`).
+    """
+
+    def __init__(self, t_delay, w_opt, t_lim=None, w_lim=None, dpi=600):
+        self.t_delay, self.w_opt = t_delay, w_opt
+        self.fig = Figure(figsize=(4, 3), dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.fig)
+        # -- PLACEHOLDER DATA OF UNIT MAXIMUM, SO THAT THE COLOR SCALE IS SET
+        # -- AS FOR ANY NORMALIZED SPECTROGRAM
+        P = np.ones((w_opt.size, t_delay.size))
+        self._im, self._text = _draw_spectrogram(
+            self.fig, 0.0, t_delay, w_opt, P, t_lim, w_lim
+        )
+
+    def update(self, z_pos, P_tw):
+        r"""Replace the data shown by the figure
+
+        Args:
+            z_pos (:obj:`float`): :math:`z`-position of the frame.
+            P_tw (:obj:`numpy.ndarray`, 2-dim): Spectrogram data.
+        """
+        I = _normalize_spectrogram(np.asarray(P_tw))
+        im = self._im
+        if isinstance(im, mpl.image.PcolorImage):
+            im.set_data(self.t_delay, self.w_opt, I)
+        elif isinstance(im, mpl.image.AxesImage):
+            im.set_data(I)
+        else:
+            im.set_array(I)
+        self._text.set_text(r"$z = %3.2lf$" % (z_pos))
+
+    def rgba(self, z_pos, P_tw):
+        r"""Render a frame
+
+        Args:
+            z_pos (:obj:`float`): :math:`z`-position of the frame.
+            P_tw (:obj:`numpy.ndarray`, 2-dim): Spectrogram data.
+
+        Returns:
+            :obj:`numpy.ndarray`: Frame as array of shape (height, width, 4).
+        """
+        self.update(z_pos, P_tw)
+        self.canvas.draw()
+        return np.asarray(self.canvas.buffer_rgba())
+
+    def save(self, z_pos, P_tw, o_name):
+        r"""Render a frame to a PNG file
+
+        Args:
+            z_pos (:obj:`float`): :math:`z`-position of the frame.
+            P_tw (:obj:`numpy.ndarray`, 2-dim): Spectrogram data.
+            o_name (:obj:`str`): Name of the file, without suffix.
+        """
+        self.update(z_pos, P_tw)
+        self.fig.savefig(o_name + ".png", format="png", dpi=self.fig.dpi)
+
+
+def render_spectrograms(
+    z,
+    t_delay,
+    w_opt,
+    P_ztw,
+    t_lim=None,
+    w_lim=None,
+    o_name=None,
+    movie=None,
+    fps=10,
+    dpi=600,
+    encoder=_FFMPEG,
+    workers=None,
+):
+    r"""Render a sequence of spectrograms as frames of an animation.
+
+    Each frame matches the figure of `plot_spectrogram`. Frames are rendered
+    by a pool of worker processes and either written to PNG files or, in
+    order, to the standard input of a video encoder.
+
+    Note:
+        Worker processes are forked, so that the spectrograms, e.g. a
+        memory-mapped array returned by `batch_spectrogram`, are shared
+        rather than pickled. If the fork start method is not available, all
+        frames are rendered by the calling process.
+
+    Args:
+        z (:obj:`numpy.ndarray`, 1-dim): :math:`z`-position of each frame.
+        t_delay (:obj:`numpy.ndarray`, 1-dim): Delay time grid.
+        w_opt (:obj:`numpy.ndarray`, 1-dim): Angular-frequency grid.
+        P_ztw (:obj:`numpy.ndarray`, 3-dim): Spectrogram data, one
+            spectrogram of shape `(w_opt.size, t_delay.size)` per frame.
+        t_lim (:obj:`tuple`): Delay time range shown (default: None).
+        w_lim (:obj:`tuple`): Angular-frequency range shown (default: None).
+        o_name (:obj:`str`): Name pattern of the PNG files, formatted with
+            the frame index, e.g. "./figs/fig_%03d" (default: None).
+        movie (:obj:`str`): Name of the movie written by the encoder
+            (default: None).
+        fps (:obj:`int`): Frames per second of the movie (default: 10).
+        dpi (:obj:`int`): Resolution of the frames (default: 600). Lower
+            values speed up rendering and encoding.
+        encoder (:obj:`str`): Command of the encoder, reading raw RGBA
+            frames from its standard input, formatted with `width`,
+            `height`, `fps` and `movie` (default: ffmpeg, see `_FFMPEG`).
+        workers (:obj:`int`): Number of worker processes (default: number of
+            cores).
+    """
+    if (o_name is None) == (movie is None):
+        raise ValueError("specify exactly one of o_name and movie")
+    tasks = range(len(z))
+    init = (z, t_delay, w_opt, P_ztw, t_lim, w_lim, dpi, o_name)
+    if workers == 1 or "fork" not in mp.get_all_start_methods():
+        _render_init(*init)
+        frames = map(_render_worker, tasks)
+        _render_output(frames, movie, fps, encoder)
+    else:
+        with mp.get_context("fork").Pool(
+            workers, initializer=_render_init, initargs=init
+        ) as pool:
+            frames = pool.imap(_render_worker, tasks)
+            _render_output(frames, movie, fps, encoder)
+
+
+def _render_output(frames, movie, fps, encoder):
+    r"""Consume rendered frames, passing them to the encoder in order"""
+    if movie is None:
+        for _ in frames:
+            pass
+        return
+    proc = None
+    try:
+        for frame in frames:
+            if proc is None:
+                height, width = frame.shape[:2]
+                cmd = [
+                    arg.format(width=width, height=height, fps=fps, movie=movie)
+                    for arg in shlex.split(encoder)
+                ]
+                proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+            proc.stdin.write(frame.tobytes())
+    finally:
+        if proc is not None:
+            proc.stdin.close()
+            if proc.wait() != 0:
+                raise RuntimeError("encoder exited with status %d" % proc.returncode)
+
+
+def _render_init(z, t_delay, w_opt, P_ztw, t_lim, w_lim, dpi, o_name):
+    r"""Build the figure reused for all frames rendered by a worker process"""
+    global _RENDER
+    frames = SpectrogramFrames(t_delay, w_opt, t_lim, w_lim, dpi)
+    _RENDER = (frames, z, P_ztw, o_name)
+
+
+def _render_worker(k):
+    r"""Render a single frame
+
+    Args:
+        k (:obj:`int`): Index of the frame.
+
+    Returns:
+        :obj:`numpy.ndarray`: Frame as RGBA array, or None if the frame was
+        written to disk.
+    """
+    frames, z, P_ztw, o_name = _RENDER
+    if o_name is not None:
+        frames.save(z[k], P_ztw[k], o_name % k)
+        return None
+    return np.array(frames.rgba(z[k], P_ztw[k]))
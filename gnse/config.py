@@ -1,11 +1,272 @@
 """
 Module containing helper routines, convenient abbreviations, and constants.
+
+The abbreviations `FT` and `IFT` dispatch to an exchangeable FFT backend.
+Available backends are
+
+    numpy   -- single-threaded numpy.fft (default)
+    scipy   -- scipy.fft, multithreaded via the `workers` argument
+    pyfftw  -- pyFFTW with cached plans and wisdom stored on disk
+
+A backend is selected at runtime via `set_fft_backend`, or upon import via
+the environment variables
+
+    GNSE_FFT_BACKEND   -- name of the backend
+    GNSE_FFT_WORKERS   -- number of threads (scipy, pyfftw)
+    GNSE_FFTW_WISDOM   -- path of the wisdom file (pyfftw)
+    GNSE_FFTW_EFFORT   -- planner effort, e.g. FFTW_MEASURE (pyfftw)
+
+Since all gnse modules call `FT` and `IFT` through this module, switching
+the backend takes effect for solvers, spectrograms and plotting routines
+alike.
 """
+import os
+import atexit
+import pickle
+import threading
 import numpy as np
 import numpy.fft as nfft
 
+
+class _NumpyFFT:
+    r"""FFT backend using numpy.fft
+
+    numpy.fft writes into `out` directly from numpy 2.0 on. For older
+    versions, the result is copied into `out`.
+    """
+
+    def __init__(self):
+        major = int(np.__version__.split(".")[0])
+        self._out = major >= 2
+
+    def _call(self, f, a, out, **kwargs):
+        if out is None:
+            return f(a, **kwargs)
+        if self._out:
+            return f(a, out=out, **kwargs)
+        out[...] = f(a, **kwargs)
+        return out
+
+    def fft(self, a, axis=-1, out=None):
+        return self._call(nfft.fft, a, out, axis=axis)
+
+    def ifft(self, a, axis=-1, out=None):
+        return self._call(nfft.ifft, a, out, axis=axis)
+
+    def rfft(self, a, axis=-1, out=None):
+        return self._call(nfft.rfft, a, out, axis=axis)
+
+    def irfft(self, a, n=None, axis=-1, out=None):
+        return self._call(nfft.irfft, a, out, n=n, axis=axis)
+
+
+class _ScipyFFT:
+    r"""FFT backend using scipy.fft
+
+    Args:
+        workers (:obj:`int`): Number of threads used per transform (default:
+            all available cores).
+    """
+
+    def __init__(self, workers=None):
+        import scipy.fft as sfft
+
+        self._sfft = sfft
+        self.workers = workers or os.cpu_count()
+
+    def fft(self, a, axis=-1, out=None):
+        res = self._sfft.fft(a, axis=axis, workers=self.workers)
+        if out is None:
+            return res
+        out[...] = res
+        return out
+
+    def ifft(self, a, axis=-1, out=None):
+        res = self._sfft.ifft(a, axis=axis, workers=self.workers)
+        if out is None:
+            return res
+        out[...] = res
+        return out
+
+    def rfft(self, a, axis=-1, out=None):
+        res = self._sfft.rfft(a, axis=axis, workers=self.workers)
+        if out is None:
+            return res
+        out[...] = res
+        return out
+
+    def irfft(self, a, n=None, axis=-1, out=None):
+        res = self._sfft.irfft(a, n=n, axis=axis, workers=self.workers)
+        if out is None:
+            return res
+        out[...] = res
+        return out
+
+
+class _PyFFTW:
+    r"""FFT backend using pyFFTW
+
+    Plans are created once per array shape, dtype, axis and direction and
+    reused for all subsequent transforms. Since a plan holds its input and
+    output arrays, plans are kept per thread, so that several threads, e.g.
+    of `spectrogram`, transform concurrently. Accumulated wisdom is loaded from
+    and, upon exit, written to the file `wisdom`.
+
+    Args:
+        workers (:obj:`int`): Number of threads used per transform (default:
+            all available cores).
+        wisdom (:obj:`str`): Path of the wisdom file (default:
+            ~/.gnse_fftw_wisdom).
+        effort (:obj:`str`): FFTW planner effort (default: FFTW_MEASURE).
+    """
+
+    def __init__(self, workers=None, wisdom=None, effort="FFTW_MEASURE"):
+        import pyfftw
+
+        self._pyfftw = pyfftw
+        self.workers = workers or os.cpu_count()
+        self.wisdom = wisdom or os.path.expanduser("~/.gnse_fftw_wisdom")
+        self.effort = effort
+        self._local = threading.local()
+        if os.path.isfile(self.wisdom):
+            with open(self.wisdom, "rb") as f:
+                pyfftw.import_wisdom(pickle.load(f))
+        atexit.register(self.save_wisdom)
+
+    def save_wisdom(self):
+        r"""Write accumulated FFTW wisdom to disk"""
+        with open(self.wisdom, "wb") as f:
+            pickle.dump(self._pyfftw.export_wisdom(), f)
+
+    def _plan(self, a, axis, direction, **kwargs):
+        key = (a.shape, a.dtype.str, axis, direction) + tuple(kwargs.values())
+        plans = self._local.__dict__.setdefault("plans", {})
+        try:
+            return plans[key]
+        except KeyError:
+            builder = getattr(self._pyfftw.builders, direction)
+            plan = plans[key] = builder(
+                np.empty_like(a),
+                axis=axis,
+                threads=self.workers,
+                planner_effort=self.effort,
+                **kwargs
+            )
+            return plan
+
+    def _transform(self, a, axis, out, direction, dtype=np.complex64, **kwargs):
+        a = np.asarray(a, dtype=np.result_type(a, dtype))
+        res = self._plan(a, axis, direction, **kwargs)(a)
+        if out is None:
+            return res.copy()
+        out[...] = res
+        return out
+
+    def fft(self, a, axis=-1, out=None):
+        return self._transform(a, axis, out, "fft")
+
+    def ifft(self, a, axis=-1, out=None):
+        return self._transform(a, axis, out, "ifft")
+
+    def rfft(self, a, axis=-1, out=None):
+        return self._transform(a, axis, out, "rfft", dtype=np.float32)
+
+    def irfft(self, a, n=None, axis=-1, out=None):
+        return self._transform(a, axis, out, "irfft", n=n)
+
+
+# -- REGISTRY OF AVAILABLE FFT BACKENDS
+_FFT_BACKENDS = {
+    "numpy": _NumpyFFT,
+    "scipy": _ScipyFFT,
+    "pyfftw": _PyFFTW,
+}
+
+_fft_backend = _NumpyFFT()
+
+
+def register_fft_backend(name, cls):
+    r"""Register a custom FFT backend.
+
+    Args:
+        name (:obj:`str`):
+            Name under which the backend can be selected.
+        cls (:obj:`callable`):
+            Factory returning an object that implements the methods
+            `fft(a, axis=-1, out=None)` and `ifft(a, axis=-1, out=None)`,
+            and, for real-input transforms, `rfft(a, axis=-1, out=None)` and
+            `irfft(a, n=None, axis=-1, out=None)`.
+    """
+    _FFT_BACKENDS[name] = cls
+
+
+def set_fft_backend(name, **kwargs):
+    r"""Select the FFT backend used by `FT` and `IFT`.
+
+    Args:
+        name (:obj:`str`):
+            Name of a registered backend ("numpy", "scipy", "pyfftw").
+        **kwargs:
+            Keyword arguments passed on to the backend, e.g. `workers`.
+
+    Returns:
+        :obj:`object`: The newly installed backend.
+    """
+    global _fft_backend
+    try:
+        cls = _FFT_BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            "unknown FFT backend '%s', choose from %s" % (name, list(_FFT_BACKENDS))
+        )
+    _fft_backend = cls(**kwargs)
+    return _fft_backend
+
+
+def get_fft_backend():
+    r"""Return the FFT backend currently used by `FT` and `IFT`."""
+    return _fft_backend
+
+
+def _set_fft_backend_from_env():
+    r"""Select FFT backend according to environment variables"""
+    name = os.environ.get("GNSE_FFT_BACKEND")
+    if not name:
+        return
+    kwargs = {}
+    if "GNSE_FFT_WORKERS" in os.environ and name != "numpy":
+        kwargs["workers"] = int(os.environ["GNSE_FFT_WORKERS"])
+    if name == "pyfftw":
+        if "GNSE_FFTW_WISDOM" in os.environ:
+            kwargs["wisdom"] = os.environ["GNSE_FFTW_WISDOM"]
+        if "GNSE_FFTW_EFFORT" in os.environ:
+            kwargs["effort"] = os.environ["GNSE_FFTW_EFFORT"]
+    set_fft_backend(name, **kwargs)
+
+
+_set_fft_backend_from_env()
+
+
 # -- CONVENIENT ABBREVIATIONS
 FTFREQ = nfft.fftfreq
-FT = nfft.ifft
-IFT = nfft.fft
 SHIFT = nfft.ifftshift
+
+
+def FT(a, axis=-1, out=None):
+    r"""Forward transform (time to frequency domain), i.e. inverse FFT"""
+    return _fft_backend.ifft(a, axis=axis, out=out)
+
+
+def IFT(a, axis=-1, out=None):
+    r"""Inverse transform (frequency to time domain), i.e. FFT"""
+    return _fft_backend.fft(a, axis=axis, out=out)
+
+
+def RFFT(a, axis=-1, out=None):
+    r"""FFT of real input, returning the non-negative frequency terms"""
+    return _fft_backend.rfft(a, axis=axis, out=out)
+
+
+def IRFFT(a, n=None, axis=-1, out=None):
+    r"""Inverse of `RFFT`, returning real output of length `n`"""
+    return _fft_backend.irfft(a, n=n, axis=axis, out=out)
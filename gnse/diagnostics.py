@@ -0,0 +1,194 @@
+r"""
+Implements diagnostics that are accumulated during the z-propagation.
+
+A `Diagnostics` object passed to `SolverBaseClass.solve` evaluates a set of
+scalar quantities of the field every `every` steps and keeps them in
+preallocated 1-dim arrays (one entry per member of a batch). Since the
+diagnostics are independent of `nSkip`, energy exchange and the like can be
+monitored at high resolution in :math:`z` while storing few or no states.
+
+Available quantities are
+
+    energy          -- :math:`E = \int |u|^2 dt`
+    photon_number   -- :math:`\int |u_\omega|^2/(\omega_0+\omega) d\omega`,
+                       requires the carrier frequency `w0`
+    hamiltonian     -- :math:`\int \beta |u_\omega|^2 d\omega +
+                       \frac{1}{2}\int \gamma |u|^4 dt`
+    centroid        -- :math:`\int t |u|^2 dt / E`
+    width           -- root-mean-square width about the centroid
+    absorbed_t      -- energy removed by the time-domain absorber `alphaT`
+    absorbed_w      -- energy removed by the frequency-domain absorber
+                       `alphaW`
+
+and the energy within user-defined frequency bands. Integrals over
+frequency are normalized so that they agree with their time-domain
+counterparts by Parseval's theorem. The absorbed energies integrate the
+absorbed power :math:`2\int \alpha |u|^2` by the trapezoidal rule over the
+recorded :math:`z`-values, so that their accuracy depends on `every`.
+
+Example:
+    Energy of the soliton and the dispersive wave of the event horizon
+    setup, recorded every 10 steps::
+
+        diag = Diagnostics(bands={"a": (-np.inf, 10.0), "n": (10.0, np.inf)}, every=10)
+        my_solver.solve(A0_t, store=False, diagnostics=diag)
+        plt.plot(diag.z, diag["a"], diag.z, diag["n"])
+"""
+import numpy as np
+from .config import IFT
+
+# -- QUANTITIES REQUIRING THE TIME-DOMAIN FIELD
+_TIME_DOMAIN = ("hamiltonian", "centroid", "width", "absorbed_t")
+
+
+class Diagnostics:
+    r"""Scalar quantities of the field, accumulated during propagation.
+
+    Args:
+        quantities (:obj:`tuple`):
+            Names of the recorded quantities (default: ("energy",)), see
+            module docstring.
+        bands (:obj:`dict`):
+            Frequency bands, mapping names to bounds (w_min, w_max) in
+            angular frequency (default: None). The energy within each band
+            is recorded under its name.
+        every (:obj:`int`):
+            Step interval in which diagnostics are recorded (default: 1).
+            For adaptive stepsize control, this refers to the grid spacing
+            of `z`.
+        w0 (:obj:`float`):
+            Carrier angular frequency, required for the photon number
+            (default: None).
+
+    Attributes:
+        z (:obj:`numpy.ndarray`):
+            :math:`z`-values at which diagnostics were recorded.
+    """
+
+    def __init__(self, quantities=("energy",), bands=None, every=1, w0=None):
+        if "photon_number" in quantities and w0 is None:
+            raise ValueError("photon number requires the carrier frequency w0")
+        self.quantities = tuple(quantities)
+        self.bands = dict(bands or {})
+        self.every = every
+        self.w0 = w0
+        self._n = 0
+        self._z = np.empty(0)
+        self._res = {}
+
+    def attach(self, solver, uw):
+        r"""Allocate storage and precompute weights for a solver run
+
+        Args:
+            solver (:obj:`SolverBaseClass`): Solver to monitor.
+            uw (:obj:`numpy.ndarray`): Frequency domain representation of the
+            initial field.
+        """
+        t, w = solver.t, solver.w
+        # -- WINDOW LENGTH: PARSEVAL FACTOR FOR THE FT CONVENTION OF config
+        self._T = t.size * (t[1] - t[0])
+        self._dt = t[1] - t[0]
+        self._t = t
+        self._beta = np.real(solver.beta)
+        self._gamma = solver.gamma
+        self._alpha = {"absorbed_t": solver.alphaT, "absorbed_w": solver.alphaW}
+        for name, alpha in self._alpha.items():
+            if name in self.quantities and alpha is None:
+                raise ValueError("%s requires an absorber of the solver" % name)
+        # -- ABSORBED POWER AT THE PREVIOUS RECORD
+        self._P = {}
+        self._weights = {
+            name: ((w >= w_min) & (w < w_max)).astype(float)
+            for name, (w_min, w_max) in self.bands.items()
+        }
+        if "photon_number" in self.quantities:
+            self._weights["photon_number"] = 1.0 / (self.w0 + w)
+        nRecords = (solver.z_.size - 1) // self.every + 1
+        shape = (nRecords,) + uw.shape[:-1]
+        self._z = np.empty(nRecords)
+        self._res = {
+            name: np.empty(shape)
+            for name in self.quantities + tuple(self.bands)
+        }
+        self._n = 0
+
+    def record(self, z, uw):
+        r"""Evaluate diagnostics for the current field
+
+        Args:
+            z (:obj:`float`): :math:`z`-position.
+            uw (:obj:`numpy.ndarray`): Frequency domain representation of the
+            field.
+        """
+        n, res, T = self._n, self._res, self._T
+        Iw = np.abs(uw) ** 2
+        for name in self.bands:
+            res[name][n] = T * (Iw @ self._weights[name])
+        if "photon_number" in res:
+            res["photon_number"][n] = T * (Iw @ self._weights["photon_number"])
+        if "energy" in res:
+            res["energy"][n] = T * Iw.sum(axis=-1)
+        if "absorbed_w" in res:
+            self._absorbed(n, z, "absorbed_w", 2.0 * T * np.sum(
+                self._alpha["absorbed_w"] * Iw, axis=-1))
+        if any(q in res for q in _TIME_DOMAIN):
+            It = np.abs(IFT(uw)) ** 2
+            dt, t = self._dt, self._t
+            E = dt * It.sum(axis=-1)
+            tc = dt * (It @ t) / E
+            if "hamiltonian" in res:
+                res["hamiltonian"][n] = T * np.einsum(
+                    "...i,...i->...", Iw, np.broadcast_to(self._beta, Iw.shape)
+                ) + 0.5 * dt * np.sum(self._gamma * It * It, axis=-1)
+            if "centroid" in res:
+                res["centroid"][n] = tc
+            if "width" in res:
+                t2 = dt * (It @ (t * t)) / E
+                res["width"][n] = np.sqrt(np.maximum(t2 - tc * tc, 0.0))
+            if "absorbed_t" in res:
+                self._absorbed(n, z, "absorbed_t", 2.0 * dt * np.sum(
+                    self._alpha["absorbed_t"] * It, axis=-1))
+        self._z[n] = z
+        self._n = n + 1
+
+    def _absorbed(self, n, z, name, P):
+        r"""Accumulate absorbed energy from the absorbed power `P` at `z`"""
+        res = self._res[name]
+        if n == 0:
+            res[n] = 0.0
+        else:
+            res[n] = res[n - 1] + 0.5 * (z - self._z[n - 1]) * (self._P[name] + P)
+        self._P[name] = P
+
+    def load(self, other):
+        r"""Continue the records of another instance, e.g. restored from a
+        checkpoint
+
+        Args:
+            other (:obj:`Diagnostics`): Diagnostics of the interrupted run.
+        """
+        self.__dict__.update(other.__dict__)
+
+    @property
+    def z(self):
+        r""":obj:`numpy.ndarray`, 1-dim: :math:`z`-values at which diagnostics
+        were recorded"""
+        return self._z[: self._n]
+
+    def __getitem__(self, name):
+        r"""Recorded values of a quantity or band energy"""
+        return self._res[name][: self._n]
+
+    def __contains__(self, name):
+        return name in self._res
+
+    def results(self):
+        r"""All recorded diagnostics
+
+        Returns:
+            :obj:`dict`: Maps "z" and the names of all quantities and bands to
+            the recorded values.
+        """
+        res = {"z": self.z}
+        res.update({name: self[name] for name in self._res})
+        return res
@@ -0,0 +1,248 @@
+r"""
+Module containing the elementwise kernels of the nonlinear step.
+
+The nonlinear phase rotation :math:`u \exp(i \gamma |u|^2 dz)` and the Kerr
+term :math:`|u|^2 u` are evaluated by an exchangeable kernel backend.
+Available backends are
+
+    numpy    -- in-place numpy ufuncs using preallocated buffers
+    numexpr  -- fused single-pass evaluation, multithreaded by numexpr
+    numba    -- fused single-pass loops compiled upon first use,
+                optionally multithreaded for large arrays
+
+The fused backends avoid the temporaries of the numpy backend and pass over
+the field only once. By default, numba or, if not installed, numexpr is
+used, falling back to numpy. A backend is selected at runtime via
+`set_kernel_backend`, or upon import via the environment variable
+
+    GNSE_KERNEL_BACKEND   -- name of the backend
+    GNSE_KERNEL_WORKERS   -- number of threads (numexpr, numba)
+
+Since the solvers evaluate their nonlinear step through this module,
+switching the backend takes effect for all solvers alike.
+"""
+import os
+import numpy as np
+
+
+class _NumpyKernels:
+    r"""Kernel backend using numpy ufuncs"""
+
+    def __init__(self):
+        pass
+
+    def nlin(self, ut, g_dz, It, ph):
+        np.abs(ut, out=It)
+        np.square(It, out=It)
+        It *= g_dz
+        np.cos(It, out=ph.real)
+        np.sin(It, out=ph.imag)
+        ut *= ph
+        return ut
+
+    def kerr(self, ut, It):
+        np.abs(ut, out=It)
+        np.square(It, out=It)
+        ut *= It
+        return ut
+
+
+class _NumexprKernels:
+    r"""Kernel backend using numexpr
+
+    Args:
+        workers (:obj:`int`): Number of threads (default: as configured by
+            numexpr).
+    """
+
+    def __init__(self, workers=None):
+        import numexpr as ne
+
+        self._ne = ne
+        if workers is not None:
+            ne.set_num_threads(workers)
+
+    def nlin(self, ut, g_dz, It, ph):
+        self._ne.evaluate(
+            "ut * complex(cos(g_dz * (real(ut)**2 + imag(ut)**2)),"
+            " sin(g_dz * (real(ut)**2 + imag(ut)**2)))",
+            local_dict={"ut": ut, "g_dz": g_dz},
+            out=ut,
+            casting="same_kind",
+        )
+        return ut
+
+    def kerr(self, ut, It):
+        self._ne.evaluate(
+            "ut * (real(ut)**2 + imag(ut)**2)",
+            local_dict={"ut": ut},
+            out=ut,
+            casting="same_kind",
+        )
+        return ut
+
+
+# -- LOOP BODIES OF THE NUMBA BACKEND, COMPILED UPON FIRST USE. _prange IS
+# -- REPLACED BY numba.prange, WHICH ACTS AS range IN SERIAL COMPILATION
+_prange = range
+
+
+def _nlin_loop(u, g):
+    for r in range(u.shape[0]):
+        for j in _prange(u.shape[1]):
+            x = u[r, j]
+            phi = g[r, j] * (x.real * x.real + x.imag * x.imag)
+            u[r, j] = x * complex(np.cos(phi), np.sin(phi))
+
+
+def _kerr_loop(u):
+    for r in range(u.shape[0]):
+        for j in _prange(u.shape[1]):
+            x = u[r, j]
+            u[r, j] = x * (x.real * x.real + x.imag * x.imag)
+
+
+class _NumbaKernels:
+    r"""Kernel backend using loops compiled by numba
+
+    Loops are compiled upon first use. If `workers` is larger than one,
+    arrays of at least `threshold` elements are processed by a multithreaded
+    variant of the loops.
+
+    Note:
+        Once numba has started its threads, forking the process is unsafe
+        and may deadlock. Do not enable multithreading in runs that fork
+        worker processes, e.g. via `sweep.sweep`.
+
+    Args:
+        workers (:obj:`int`): Number of threads (default: None, i.e. no
+            multithreading).
+        threshold (:obj:`int`): Minimal array size for multithreading
+            (default: 2**14).
+    """
+
+    def __init__(self, workers=None, threshold=2**14):
+        global _prange
+        import numba
+
+        _prange = numba.prange
+        self._numba = numba
+        self.threshold = threshold if workers and workers > 1 else np.inf
+        if workers and workers > 1:
+            numba.set_num_threads(workers)
+        self._loops = {}
+
+    def _get(self, parallel):
+        try:
+            return self._loops[parallel]
+        except KeyError:
+            njit = self._numba.njit(parallel=parallel)
+            loops = self._loops[parallel] = (njit(_nlin_loop), njit(_kerr_loop))
+            return loops
+
+    @staticmethod
+    def _rows(a):
+        r"""View of array as 2-dim array of rows"""
+        return a.reshape(-1, a.shape[-1])
+
+    def nlin(self, ut, g_dz, It, ph):
+        nlin, _ = self._get(ut.size >= self.threshold)
+        u = self._rows(ut)
+        # -- BROADCAST WITHOUT COPY, e.g. SCALAR OR PER-RUN COEFFICIENTS
+        g = np.asarray(g_dz, dtype=It.dtype)
+        g = np.broadcast_to(g.reshape((1,) * (2 - g.ndim) + g.shape[-2:]), u.shape)
+        nlin(u, g)
+        return ut
+
+    def kerr(self, ut, It):
+        _, kerr = self._get(ut.size >= self.threshold)
+        kerr(self._rows(ut))
+        return ut
+
+
+# -- REGISTRY OF AVAILABLE KERNEL BACKENDS
+_KERNEL_BACKENDS = {
+    "numpy": _NumpyKernels,
+    "numexpr": _NumexprKernels,
+    "numba": _NumbaKernels,
+}
+
+
+def set_kernel_backend(name, **kwargs):
+    r"""Select the backend evaluating the nonlinear step.
+
+    Args:
+        name (:obj:`str`):
+            Name of a backend ("numpy", "numexpr", "numba").
+        **kwargs:
+            Keyword arguments passed on to the backend, e.g. `workers`.
+
+    Returns:
+        :obj:`object`: The newly installed backend.
+    """
+    global _kernel_backend
+    try:
+        cls = _KERNEL_BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            "unknown kernel backend '%s', choose from %s"
+            % (name, list(_KERNEL_BACKENDS))
+        )
+    _kernel_backend = cls(**kwargs)
+    return _kernel_backend
+
+
+def get_kernel_backend():
+    r"""Return the backend currently evaluating the nonlinear step."""
+    return _kernel_backend
+
+
+def _default_kernel_backend():
+    r"""Select kernel backend according to environment variable or, if not
+    set, the fastest installed backend"""
+    name = os.environ.get("GNSE_KERNEL_BACKEND")
+    kwargs = {}
+    if "GNSE_KERNEL_WORKERS" in os.environ and name != "numpy":
+        kwargs["workers"] = int(os.environ["GNSE_KERNEL_WORKERS"])
+    if name:
+        return set_kernel_backend(name, **kwargs)
+    for name in ("numba", "numexpr"):
+        try:
+            return set_kernel_backend(name, **kwargs)
+        except ImportError:
+            pass
+    return set_kernel_backend("numpy")
+
+
+_kernel_backend = _default_kernel_backend()
+
+
+def nlin(ut, g_dz, It, ph):
+    r"""Nonlinear phase rotation :math:`u \exp(i g |u|^2)`, computed in place
+
+    Args:
+        ut (:obj:`numpy.ndarray`): Time domain representation of the field
+        (overwritten).
+        g_dz (:obj:`float` or :obj:`numpy.ndarray`): Product of nonlinear
+        coefficient and stepsize, broadcastable to `ut`.
+        It (:obj:`numpy.ndarray`): Real work array of the shape of `ut`.
+        ph (:obj:`numpy.ndarray`): Complex work array of the shape of `ut`.
+
+    Returns:
+        :obj:`numpy.ndarray`: Updated field `ut`.
+    """
+    return _kernel_backend.nlin(ut, g_dz, It, ph)
+
+
+def kerr(ut, It):
+    r"""Kerr nonlinearity :math:`|u|^2 u`, computed in place
+
+    Args:
+        ut (:obj:`numpy.ndarray`): Time domain representation of the field
+        (overwritten).
+        It (:obj:`numpy.ndarray`): Real work array of the shape of `ut`.
+
+    Returns:
+        :obj:`numpy.ndarray`: Updated field `ut`.
+    """
+    return _kernel_backend.kerr(ut, It)
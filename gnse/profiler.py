@@ -0,0 +1,215 @@
+"""
+Implements optional instrumentation of the z-propagation loop.
+
+A `SolverProfiler` passed to `SolverBaseClass.solve` replaces the phases of a
+step (forward and inverse FFT, nonlinear and linear substeps) by timed
+wrappers for the duration of the run, and times the storage of the field.
+Without a profiler, the solvers run unmodified.
+
+Example:
+    Print progress every 10 seconds and export a summary::
+
+        prof = SolverProfiler(progress=print_progress, interval=10.0)
+        my_solver.solve(A0_t, profiler=prof)
+        prof.export("profile.json")
+"""
+import csv
+import json
+import time
+from .solver import SolverBaseClass
+
+# -- PHASES OF A STEP AND THE SOLVER METHODS IMPLEMENTING THEM
+_PHASES = {
+    "fft": "_FT",
+    "ifft": "_IFT",
+    "nonlinear": ("_nlin", "_kerr"),
+    "linear": "_lin",
+}
+
+
+class SolverProfiler:
+    r"""Per-phase timings and progress reports for a solver run.
+
+    Args:
+        progress (:obj:`callable`):
+            Progress hook, called as `progress(stats)` with the dictionary
+            returned by `stats` at most every `interval` seconds (default:
+            None).
+        interval (:obj:`float`):
+            Minimal wall-clock time in seconds between two progress reports
+            (default: 1.0).
+
+    Attributes:
+        timings (:obj:`dict`):
+            Accumulated wall-clock time in seconds per phase ("fft", "ifft",
+            "nonlinear", "linear", "storage").
+        calls (:obj:`dict`):
+            Number of calls per phase.
+    """
+
+    def __init__(self, progress=None, interval=1.0):
+        self.progress = progress
+        self.interval = interval
+        self._solver = None
+        self._reset()
+
+    def _reset(self):
+        self.timings = dict.fromkeys(list(_PHASES) + ["storage"], 0.0)
+        self.calls = dict.fromkeys(self.timings, 0)
+        self._nSingleSteps = 0
+        self._nSteps0 = 0
+        self._z = None
+        self._snapshotBytes = 0
+        self._tStart = self._tStop = self._tLast = time.perf_counter()
+
+    def _timed(self, fun, phase):
+        r"""Wrap function so that its wall-clock time is accumulated"""
+        timings, calls, clock = self.timings, self.calls, time.perf_counter
+
+        def _fun(*args, **kwargs):
+            t0 = clock()
+            res = fun(*args, **kwargs)
+            timings[phase] += clock() - t0
+            calls[phase] += 1
+            return res
+
+        return _fun
+
+    def attach(self, solver):
+        r"""Instrument solver
+
+        Args:
+            solver (:obj:`SolverBaseClass`): Solver to instrument.
+        """
+        self._reset()
+        self._solver = solver
+        self._nSteps0 = solver.nSteps
+        for phase, names in _PHASES.items():
+            for name in (names,) if isinstance(names, str) else names:
+                setattr(solver, name, self._timed(getattr(solver, name), phase))
+        step, multiStep = solver.singleStep, solver.multiStep
+        fused = type(solver).multiStep is not SolverBaseClass.multiStep
+
+        def _singleStep(uw):
+            uw = step(uw)
+            self._count(1)
+            return uw
+
+        def _multiStep(uw, m):
+            uw = multiStep(uw, m)
+            # -- STEPS OF THE DEFAULT IMPLEMENTATION ARE COUNTED BY _singleStep
+            if fused:
+                self._count(m)
+            return uw
+
+        solver.singleStep = _singleStep
+        solver.multiStep = _multiStep
+
+    def _count(self, m):
+        r"""Count performed steps and report progress if due"""
+        self._nSingleSteps += m
+        if self.progress is not None:
+            now = time.perf_counter()
+            if now - self._tLast >= self.interval:
+                self._tLast = now
+                self.progress(self.stats())
+
+    def detach(self):
+        r"""Remove instrumentation from solver"""
+        self._tStop = time.perf_counter()
+        for name in self._solver._phaseHooks:
+            self._solver.__dict__.pop(name, None)
+        if self.progress is not None:
+            self.progress(self.stats())
+
+    def record(self, z, t_storage):
+        r"""Record a state kept by the solver
+
+        Args:
+            z (:obj:`float`): :math:`z`-position of the state.
+            t_storage (:obj:`float`): Wall-clock time spent on storage.
+        """
+        self._z = z
+        self.timings["storage"] += t_storage
+        self.calls["storage"] += 1
+        solver = self._solver
+        self._snapshotBytes = solver._u[: solver._nStored].nbytes
+
+    def stats(self):
+        r"""Summary of the run so far.
+
+        Returns:
+            :obj:`dict`: Elapsed wall-clock time, number of accepted steps and
+            calls to `singleStep`, steps per second, current :math:`z`-position,
+            estimated time to completion (ETA, in seconds), bytes of stored
+            states, and time spent per phase (absolute and as fraction of the
+            elapsed time). Time not attributed to a phase is listed as
+            "other".
+        """
+        solver = self._solver
+        running = self._tStop <= self._tStart
+        elapsed = (time.perf_counter() if running else self._tStop) - self._tStart
+        nSteps = solver.nSteps - self._nSteps0
+        rate = nSteps / elapsed if elapsed > 0 else 0.0
+        # -- ESTIMATE TIME TO COMPLETION FROM STEPS (FIXED STEPSIZE) OR FROM
+        # -- PROPAGATION DISTANCE (ADAPTIVE STEPSIZE)
+        z0, z1 = solver.z_[0], solver.z_[-1]
+        if not running:
+            eta = 0.0
+        elif solver.tol is None and rate > 0:
+            eta = (solver.z_.size - 1 - solver.nSteps) / rate
+        elif self._z is not None and self._z > z0:
+            eta = elapsed * (z1 - self._z) / (self._z - z0)
+        else:
+            eta = None
+        phases = dict(self.timings)
+        phases["other"] = max(elapsed - sum(self.timings.values()), 0.0)
+        return {
+            "solver": type(solver).__name__,
+            "elapsed": elapsed,
+            "steps": nSteps,
+            "single_steps": self._nSingleSteps,
+            "steps_per_s": rate,
+            "z": self._z,
+            "eta": eta,
+            "snapshot_bytes": self._snapshotBytes,
+            "phases": phases,
+            "fractions": {k: v / elapsed if elapsed > 0 else 0.0 for k, v in phases.items()},
+            "calls": dict(self.calls),
+        }
+
+    def export(self, path):
+        r"""Write summary to disk
+
+        Args:
+            path (:obj:`str`): Name of output file. Files ending in `.csv`
+            hold one row per phase, all other files are written as json.
+        """
+        stats = self.stats()
+        if not path.endswith(".csv"):
+            with open(path, "w") as f:
+                json.dump(stats, f, indent=1)
+            return
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["phase", "seconds", "fraction", "calls"])
+            for phase, sec in stats["phases"].items():
+                writer.writerow(
+                    [phase, sec, stats["fractions"][phase], stats["calls"].get(phase, "")]
+                )
+            for key in ("elapsed", "steps", "steps_per_s", "snapshot_bytes"):
+                writer.writerow([key, stats[key], "", ""])
+
+
+def print_progress(stats):
+    r"""Progress hook printing a single line per report.
+
+    Args:
+        stats (:obj:`dict`): Summary as returned by `SolverProfiler.stats`.
+    """
+    eta = "--" if stats["eta"] is None else "%.1fs" % stats["eta"]
+    z = float("nan") if stats["z"] is None else stats["z"]
+    print(
+        "# z = %g, steps = %d (%.1f/s), elapsed = %.1fs, ETA = %s"
+        % (z, stats["steps"], stats["steps_per_s"], stats["elapsed"], eta)
+    )
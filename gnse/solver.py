@@ -3,6 +3,12 @@ Implents solver base class that serves as driver for different propagation
 algorithms. Currently, the following algorithms are supported:
 
     SimpleSplitStepSolver
+    Symmetric_Split_Step_Solver
+    Interaction_picture_method
+    Yoshida4SplitStepSolver
+    Suzuki4SplitStepSolver
+    Yoshida6SplitStepSolver
+    BlanesMoan4SplitStepSolver
 
 DATE: 2021-04-22
 
@@ -23,8 +29,12 @@ Di 27 Apr 2021 18:18:33 CEST
 * moved changelog to version.py
 
 """
+import os
+import time
+import pickle
 import numpy as np
-from .config import FTFREQ, FT, IFT
+from .config import FTFREQ, FT, IFT, RFFT, IRFFT
+from . import kernels
 
 
 class SolverBaseClass:
@@ -33,11 +43,115 @@ class SolverBaseClass:
     Implements solver base class that serves as driver for the implemented
     :math:`z`-propagation algorithms.
 
+    Note:
+        Linear propagators that depend on the stepsize only are computed once
+        per stepsize and cached (see `_propagators`). Complex work arrays are
+        allocated once at the start of `solve` (see `_initWorkArrays`), so
+        that `singleStep` advances the field in place without allocating
+        new arrays.
+
+        Long runs can be checkpointed to disk by `solve` every given number
+        of steps or seconds. A checkpoint holds the solver configuration, the
+        current field and step counters, and the states stored so far. Upon
+        restart, the propagation continues as if it was never interrupted.
+
+        If a tolerance `tol` is given, `solve` controls the stepsize
+        adaptively by the local error method [1]: each step is performed
+        once with stepsize :math:`h` and twice with stepsize :math:`h/2`,
+        and the relative deviation of both results serves as error estimate.
+        Stepsizes are restricted to powers of two times the grid spacing of
+        `z`, ranging down to :math:`dz/2^{maxRefine}`, so that propagators
+        can be cached and the field is stored exactly at the requested
+        :math:`z`-values.
+
+        With `dtype=numpy.complex64`, fields, propagators, work arrays and
+        stored states are kept in single precision, halving memory traffic
+        and storage. Round-off then accumulates to relative errors of about
+        :math:`10^{-5}` per hundred steps (see numExp07).
+
+        Besides the Kerr effect, the nonlinear part may include a delayed
+        Raman response and self-steepening, i.e. the generalized NSE
+
+        .. math::
+            \partial_z u_\omega = i\beta(\omega) u_\omega + i\gamma
+            (1 + \omega/\omega_0) \mathcal{F}\left[u(t) \int R(t') |u(t-t')|^2
+            dt'\right],
+
+        with :math:`R(t) = (1-f_R)\delta(t) + f_R h_R(t)` [2]. The spectrum of
+        :math:`h_R` is computed once, and the convolution takes one real-input
+        FFT pair per evaluation of the nonlinear part. Since the Raman
+        response is real, the nonlinear substep of the splitting solvers
+        remains an exact phase rotation. With self-steepening, the splitting
+        solvers integrate the nonlinear substep by a Runge-Kutta step in the
+        frequency domain: the midpoint rule with two evaluations of the
+        nonlinear part for the simple and symmetric split step methods, the
+        classical 4th order method with four evaluations for the composition
+        solvers. The latter limits `Yoshida6SplitStepSolver` to 4th order
+        with self-steepening. `Interaction_picture_method` requires no extra
+        evaluations.
+
+        Given a reference velocity `v0` (or a reference frequency `wRef`,
+        from which :math:`v_0 = 1/\beta_1(\omega_{ref})` is determined),
+        the field is propagated in the frame of reference moving with
+        :math:`v_0`, i.e. the group delay :math:`-\omega/v_0` is included
+        in the linear propagators. Stored states are then already in the
+        moving frame and a pulse at the reference frequency stays centered
+        in the time window.
+
+        Radiation leaving the time window, or reaching the edges of the
+        frequency window, can be removed by absorbing layers, specified by
+        absorption rates :math:`\alpha_t(t)` and :math:`\alpha_\omega(\omega)`
+        per unit length (see `absorbing_layer`). The frequency-domain
+        absorber enters the linear propagators as imaginary part of `beta`
+        at no extra cost. The time-domain absorber adds :math:`-\alpha_t u` to
+        the nonlinear part, independent of the nonlinear coefficient and of
+        self-steepening. The splitting solvers apply it as damping factor
+        :math:`\exp(-\alpha_t dz/2)` before and after the nonlinear phase
+        rotation of each nonlinear substep, `Interaction_picture_method`
+        evaluates it with the nonlinear part at the cost of one FFT per
+        evaluation. The energy removed by either absorber is
+        available as diagnostic (see module `diagnostics`).
+
+        Stored states can be restricted to a region of interest. Given a
+        frequency window `wLim`, only the spectral components within the
+        window are stored. The window is shifted to baseband by the angular
+        frequency `wShift` of its central bin, and the time-domain
+        representation `utz` is evaluated on the coarsest grid of `nT`
+        points spanning the period of `t` that resolves the shifted window
+        (spectral resampling), i.e. `utz` holds the demodulated field
+        :math:`u(t)\exp(i\omega_{\rm shift} t)`, while `wRec` holds the
+        angular frequencies of the original field. Given a time window
+        `tLim`, states are stored in the time domain on this grid, cropped
+        to the window. The
+        grids on which `utz` and `uwz` are given are `tRec` and `wRec`. If
+        states are stored in a memory-mapped file, the grids are written
+        alongside (see `solve`).
+
+    References:
+        [1] O. V. Sinkin, R. Holzlöhner, J. Zweck, C. R. Menyuk,
+        Optimization of the split-step Fourier method in modeling
+        optical-fiber communications systems,
+        J. Lightwave Technol. 21 (2003) 61,
+        https://doi.org/10.1109/JLT.2003.808628.
+
+        [2] K. J. Blow, D. Wood,
+        Theoretical description of transient stimulated Raman scattering in
+        optical fibers,
+        IEEE J. Quantum Electron. 25 (1989) 2665,
+        https://doi.org/10.1109/3.40655.
+
     Attributes:
         beta (:obj:`numpy.ndarray`):
-           Frequency dependent propagation constant.
+           Frequency dependent propagation constant, including the group
+           delay :math:`-\omega/v_0` in a moving frame of reference.
         gamma (:obj:`float` or :obj:`numpy.ndarray`):
            Coefficient function of nonlinear part.
+        v0 (:obj:`float` or :obj:`numpy.ndarray`):
+           Velocity of the frame of reference (None in the rest frame).
+        alphaT (:obj:`numpy.ndarray`):
+           Absorption rate in the time domain (None without absorber).
+        alphaW (:obj:`numpy.ndarray`):
+           Absorption rate in the frequency domain (None without absorber).
         dz (:obj:`float`):
             Stepsize, i.e. :math:`z`-increment for integration.
         z_ (:obj:`numpy.ndarray`):
@@ -46,14 +160,41 @@ class SolverBaseClass:
             Temporal grid.
         w (:obj:`numpy.ndarray`):
             Angular frequency grid.
-        _z (:obj:`list`):
-            :math:`z`-values for which field is stored and available after
-            propagation.
-        _uz (:obj:`list`):
-            Frequency domain representation of the field at :math:`z`-values
-            listed in `_z`.
+        tRec (:obj:`numpy.ndarray`):
+            Temporal grid of the stored states `utz`.
+        wRec (:obj:`numpy.ndarray`):
+            Angular frequency grid of the stored states `uwz`.
+        nT (:obj:`int`):
+            Number of points of the resampled temporal grid of the stored
+            states.
+        wShift (:obj:`float`):
+            Angular frequency by which the time-domain representation of the
+            stored states is demodulated (zero without resampling).
+        _z (:obj:`numpy.ndarray`):
+            Preallocated :math:`z`-values for which field is stored and
+            available after propagation.
+        _u (:obj:`numpy.ndarray` or :obj:`numpy.memmap`):
+            Preallocated frequency domain representation of the field at
+            :math:`z`-values listed in `_z`, one row per stored state.
+        _nStored (:obj:`int`):
+            Number of states stored in `_z` and `_u`.
         nSkip (:obj:`int`):
             Step interval in which data is stored upon propagation (default: 1).
+            The field at the last :math:`z`-value is stored in any case.
+        tol (:obj:`float`):
+            Local error tolerance for adaptive stepsize control (default:
+            None, i.e. fixed stepsize).
+        maxRefine (:obj:`int`):
+            Maximal number of stepsize halvings below the grid spacing of
+            `z` in adaptive mode (default: 10).
+        nSteps (:obj:`int`):
+            Number of accepted steps performed by the last call to `solve`.
+        dtype (:obj:`numpy.dtype`):
+            Complex data type of the field (default: numpy.complex128).
+        fR (:obj:`float`):
+            Fractional contribution of the delayed Raman response.
+        w0 (:obj:`float`):
+            Reference angular frequency for self-steepening.
 
     Args:
         z (:obj:`numpy.ndarray`):
@@ -61,62 +202,1209 @@ class SolverBaseClass:
         t (:obj:`numpy.ndarray`):
             Temporal grid.
         beta (:obj:`numpy.ndarray`):
-           Frequency dependent propagation constant.
+           Frequency dependent propagation constant. For batched propagation,
+           an array of shape `(n_runs, Nt)` assigns an individual propagation
+           constant to each member of the batch.
         gamma (:obj:`float` or :obj:`numpy.ndarray`):
-           Coefficient function of nonlinear part.
+           Coefficient function of nonlinear part. For batched propagation,
+           an array of shape `(n_runs, 1)` assigns an individual nonlinear
+           coefficient to each member of the batch.
         nSkip (:obj:`int`):
             Step interval in which data is stored upon propagation (default: 1).
+            The field at the last :math:`z`-value is stored in any case.
+        tol (:obj:`float`):
+            Local error tolerance for adaptive stepsize control (default:
+            None, i.e. fixed stepsize).
+        maxRefine (:obj:`int`):
+            Maximal number of stepsize halvings below the grid spacing of
+            `z` in adaptive mode (default: 10).
+        dtype (:obj:`numpy.dtype`):
+            Complex data type of the field, either numpy.complex128
+            (default) or numpy.complex64.
+        fR (:obj:`float`):
+            Fractional contribution of the delayed Raman response (default:
+            0.0, i.e. instantaneous Kerr response only).
+        hR (:obj:`callable`):
+            Raman response function :math:`h_R(t)` for :math:`t \geq 0`
+            (default: `raman_response`, i.e. the model of Ref. [2]). It is
+            normalized to unit area on the temporal grid.
+        w0 (:obj:`float`):
+            Reference angular frequency for self-steepening, entering via
+            :math:`\gamma(\omega) = \gamma (1 + \omega/\omega_0)`
+            (default: None, i.e. no self-steepening). Requires a scalar
+            `gamma` or one of shape `(n_runs, 1)`.
+        v0 (:obj:`float` or :obj:`numpy.ndarray`):
+            Velocity of the frame of reference in which the field is
+            propagated (default: None, i.e. rest frame). For batched
+            propagation, an array of shape `(n_runs, 1)` assigns an
+            individual velocity to each member of the batch.
+        wRef (:obj:`float`):
+            Reference angular frequency, alternative to `v0`. The frame of
+            reference moves with the group velocity at `wRef`, obtained by
+            numerical differentiation of `beta` (default: None).
+        alphaT (:obj:`numpy.ndarray`):
+            Absorption rate (per unit length) on the temporal grid, e.g.
+            absorbing layers at the edges of the time window (default:
+            None).
+        alphaW (:obj:`numpy.ndarray`):
+            Absorption rate (per unit length) on the angular frequency grid
+            `w`, e.g. absorbing layers at the edges of the frequency window
+            or a spectral filter (default: None).
+        tLim (:obj:`tuple`):
+            Time window (t_min, t_max) of the stored states (default: None,
+            i.e. full temporal grid).
+        wLim (:obj:`tuple`):
+            Angular frequency window (w_min, w_max) of the stored states
+            (default: None, i.e. full angular frequency grid).
+        nT (:obj:`int`):
+            Number of points of the resampled temporal grid of the stored
+            states, at most `Nt` (default: None, i.e. the smallest number
+            resolving `wLim` shifted to baseband, or `Nt` without frequency
+            window).
 
     """
 
-    def __init__(self, z, t, beta, gamma, nSkip=1):
+    # -- WORK ARRAYS, REALLOCATED FOR EACH RUN AND NOT CHECKPOINTED
+    _workArrays = ("_ut", "_ph", "_It", "_IR", "_IRw", "_uA", "_v", "_k", "_acc", "_c")
+
+    # -- ORDER OF THE RUNGE-KUTTA STEP INTEGRATING A NONLINEAR SUBSTEP WITH
+    # -- SELF-STEEPENING (2 OR 4), SEE _nlinStep
+    _nlinOrder = 4
+
+    # -- NUMBER OF NONLINEAR SUBSTEPS PER STEP
+    _nlinSubsteps = 1
+
+    def __init__(
+        self,
+        z,
+        t,
+        beta,
+        gamma,
+        nSkip=1,
+        tol=None,
+        maxRefine=10,
+        dtype=np.complex128,
+        fR=0.0,
+        hR=None,
+        w0=None,
+        v0=None,
+        wRef=None,
+        alphaT=None,
+        alphaW=None,
+        tLim=None,
+        wLim=None,
+        nT=None,
+    ):
+        self.dtype = np.dtype(dtype)
         self.nSkip = nSkip
-        self.beta = beta
         self.gamma = gamma
-        self.dz = z[1] - z[0]
+        self.tol = tol
+        self.maxRefine = maxRefine
         self.z_ = z
         self.t = t
         self.w = FTFREQ(t.size, d=t[1] - t[0]) * 2 * np.pi
-        self._z = []
-        self._u = []
+        self.v0 = group_velocity(self.w, beta, wRef) if wRef is not None else v0
+        self.beta = beta if self.v0 is None else beta - self.w / self.v0
+        self.alphaT = alphaT
+        self.alphaW = alphaW
+        if alphaW is not None:
+            self.beta = self.beta + 1j * alphaW
+        self.fR = fR
+        self.w0 = w0
+        self._initNonlinearity(hR)
+        self._initRecording(tLim, wLim, nT)
+        self.reset()
+        self._ckpt = None
+        self._diag = None
+        self._dz0 = z[1] - z[0]
+        self._propCache = {}
+        self._setStepsize(self._dz0)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for key in self._propCache.get(self.dz, {}):
+            state.pop(key)
+        for key in self._workArrays + self._phaseHooks + (
+            "_u",
+            "_z",
+            "_utz",
+            "_propCache",
+            "_ckpt",
+            "_diag",
+        ):
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.reset()
+        self._ckpt = None
+        self._diag = None
+        self._propCache = {}
+        self._setStepsize(self._dz0)
+
+    def _initRecording(self, tLim, wLim, nT):
+        r"""Precompute the reduction of stored states to a region of interest
+
+        Sets `tRec`, `wRec` and `wShift`, `_recIdx`, the indices of the bins
+        of the resampled grid in `w`, `_recMask`, the bins of the resampled
+        grid within the frequency window (None without window), `_recT`,
+        the slice of the resampled grid within the time window (None
+        without window, i.e. states are stored in the frequency domain), and
+        `_recPhase`, the constant phase of the time-domain representation
+        relative to `t[0]` (None without shift).
+
+        Args:
+            tLim, wLim (:obj:`tuple`): Time and angular frequency window.
+            nT (:obj:`int`): Number of points of the resampled grid.
+        """
+        t, w, Nt = self.t, self.w, self.t.size
+        inWindow = np.ones(Nt, dtype=bool)
+        kc = 0
+        if wLim is not None:
+            inWindow = (w >= wLim[0]) & (w <= wLim[1])
+            k = np.round(FTFREQ(Nt, d=1.0 / Nt))[inWindow]
+            if k.size:
+                # -- BIN AT THE CENTER OF THE WINDOW, SHIFTED TO BASEBAND
+                kc = int(np.round(0.5 * (k.min() + k.max())))
+        if nT is None:
+            # -- COARSEST RESAMPLED GRID THAT HOLDS ALL BINS OF THE SHIFTED
+            # -- WINDOW, WITH BIN INDICES -nT/2, ..., nT/2-1. WITHOUT A
+            # -- REDUCTION BELOW Nt, THE FULL GRID IS KEPT UNSHIFTED
+            k = np.round(FTFREQ(Nt, d=1.0 / Nt))[inWindow] - kc
+            nT = Nt
+            if k.size:
+                nT = min(max(-2 * int(k.min()), 2 * int(k.max()) + 2, 2), Nt)
+        if nT >= Nt:
+            nT, kc = Nt, 0
+        self.nT = nT
+        self.wShift = kc * (w[1] - w[0])
+        self._recIdx = (np.round(FTFREQ(nT, d=1.0 / nT)).astype(int) + kc) % Nt
+        if wLim is not None and inWindow[self._recIdx].sum() < inWindow.sum():
+            raise ValueError("frequency window exceeds resampled grid of nT=%d" % nT)
+        self._recMask = None if wLim is None else inWindow[self._recIdx]
+        self._recPhase = None if kc == 0 else np.exp(1j * self.wShift * t[0])
+        tn = t[0] + np.arange(nT) * (Nt * (t[1] - t[0]) / nT)
+        self._recT = None
+        if tLim is not None:
+            j = np.flatnonzero((tn >= tLim[0]) & (tn <= tLim[1]))
+            self._recT = slice(j[0], j[-1] + 1)
+            self.tRec = tn[self._recT]
+            self.wRec = FTFREQ(self.tRec.size, d=tn[1] - tn[0]) * 2 * np.pi
+            self.wRec += self.wShift
+        else:
+            self.tRec = tn
+            self.wRec = w[self._recIdx]
+            if self._recMask is not None:
+                self.wRec = self.wRec[self._recMask]
+
+    def _reduce(self, uw):
+        r"""Reduce field to the region of interest of the stored states
+
+        Args:
+            uw (:obj:`numpy.ndarray`): Frequency domain representation of the
+            field.
+
+        Returns:
+            :obj:`numpy.ndarray`: Stored representation, i.e. time-domain
+            field on `tRec` with time window, spectrum on `wRec` otherwise.
+        """
+        if self.nT == self.t.size and self._recMask is None and self._recT is None:
+            return uw
+        v = uw[..., self._recIdx]
+        if self._recT is None:
+            return v if self._recMask is None else v[..., self._recMask]
+        if self._recMask is not None:
+            v[..., ~self._recMask] = 0.0
+        if self._recPhase is not None:
+            v *= self._recPhase
+        return IFT(v, axis=-1)[..., self._recT]
+
+    def _toTime(self, u):
+        r"""Time-domain representation of stored states on `tRec`
+
+        Args:
+            u (:obj:`numpy.ndarray`): Stored states, see `_reduce`.
+
+        Returns:
+            :obj:`numpy.ndarray`: Field on `tRec`, demodulated by `wShift`.
+        """
+        if self._recT is not None:
+            return u
+        if self._recMask is not None:
+            v = np.zeros(u.shape[:-1] + (self.nT,), dtype=u.dtype)
+            v[..., self._recMask] = u
+            u = v
+        ut = IFT(u, axis=-1)
+        if self._recPhase is not None:
+            ut *= self._recPhase
+        return ut
+
+    def _absorber(self, h):
+        r"""Time-domain absorber for a nonlinear substep of length `h`
+
+        Args:
+            h (:obj:`float`): Length of the substep.
+
+        Returns:
+            :obj:`list`: [a_half, a_dz], the damping factor
+            :math:`\exp(-\alpha_t h/2)` and the product :math:`\alpha_t h`,
+            or None without absorber. See `_nlinStep`.
+        """
+        if self.alphaT is None:
+            return None
+        return [np.exp(-0.5 * h * self.alphaT), h * self.alphaT]
+
+    def _initNonlinearity(self, hR):
+        r"""Precompute Raman response spectrum and self-steepening factor
+
+        Sets `_hRw`, the real-input FFT of the normalized Raman response
+        sampled at delays :math:`0, dt, 2dt, \ldots` (None if `fR` is zero),
+        `_i_gw`, the frequency dependence :math:`i(1+\omega/\omega_0)` of
+        the nonlinear coefficient (None without self-steepening).
+
+        Args:
+            hR (:obj:`callable`): Raman response function.
+        """
+        self._hRw = self._i_gw = None
+        if self.fR:
+            tau = self.t - self.t[0]
+            h = (raman_response if hR is None else hR)(tau)
+            self._hRw = self._castPropagator(RFFT(h / h.sum()) + 0j)
+        if self.w0 is not None:
+            if np.ndim(self.gamma) and np.shape(self.gamma)[-1] != 1:
+                raise ValueError(
+                    "self-steepening requires gamma to be scalar or of shape (n_runs, 1)"
+                )
+            self._i_gw = self._castPropagator(1j * (1.0 + self.w / self.w0))
+
+    @property
+    def nFFT(self):
+        r""":obj:`int`: Number of FFTs per step, including the real-input
+        FFTs of the Raman convolution and, in Runge-Kutta evaluations of the
+        nonlinear part, the FFT of the time-domain absorber"""
+        rk = self._i_gw is not None
+        return self._nlinSubsteps * (self._nlinOrder if rk else 1) * self._nlinFFT(rk)
+
+    def _nlinFFT(self, rk):
+        r"""Number of FFTs per evaluation of the nonlinear part
+
+        Args:
+            rk (:obj:`bool`): Whether the evaluation is a Runge-Kutta stage,
+            see `_dudz`.
+        """
+        n = 2 if self._hRw is None else 4
+        if rk and self.alphaT is not None:
+            n += 1
+        return n
+
+    def _propagators(self, dz):
+        r"""Stepsize dependent propagators
+
+        Subclasses override this method to precompute the exponential
+        factors required by their `singleStep` implementation.
+
+        Args:
+            dz (:obj:`float`): Stepsize.
+
+        Returns:
+            :obj:`dict`: Propagators, keyed by the attribute name under which
+            `singleStep` accesses them.
+        """
+        return {}
+
+    def _setStepsize(self, dz):
+        r"""Set stepsize and install the corresponding propagators
+
+        Propagators are computed once per stepsize and cached.
+
+        Args:
+            dz (:obj:`float`): Stepsize.
+        """
+        try:
+            props = self._propCache[dz]
+        except KeyError:
+            props = self._propCache[dz] = {
+                k: self._castPropagator(v) for k, v in self._propagators(dz).items()
+            }
+        self.dz = dz
+        self.__dict__.update(props)
+
+    def _castPropagator(self, v):
+        r"""Convert propagator to the data type of the field
+
+        Complex values are converted to `dtype`, real values to the
+        corresponding real type, so that in-place operations on the field
+        are performed in the precision of the field. Lists are converted
+        elementwise, None is kept.
+        """
+        if v is None:
+            return None
+        if isinstance(v, list):
+            return [self._castPropagator(x) for x in v]
+        if np.iscomplexobj(v):
+            return np.asarray(v, dtype=self.dtype)
+        return np.asarray(v, dtype=self.dtype.type(0).real.dtype)
+
+    def _initWorkArrays(self, uw):
+        r"""Allocate work arrays matching the shape of the field
+
+        Allocates a complex time-domain buffer `_ut` and a real buffer `_It`
+        for the instantaneous intensity, as well as a complex buffer `_ph`
+        holding the nonlinear phase factor. With self-steepening, buffers
+        for the Runge-Kutta nonlinear substep are allocated in addition.
+        Existing buffers are reused if their shape matches.
+
+        Args:
+            uw (:obj:`numpy.ndarray`): Frequency domain representation of the
+            field.
+        """
+        if getattr(self, "_ut", None) is not None and self._ut.shape == uw.shape:
+            return
+        self._ut = np.empty_like(uw)
+        self._ph = np.empty_like(uw)
+        self._It = np.empty(uw.shape, dtype=uw.real.dtype)
+        if self.alphaT is not None:
+            # -- ABSORBED PART OF THE FIELD
+            self._uA = np.empty_like(uw)
+        if self._hRw is not None:
+            # -- BUFFERS OF THE RAMAN CONVOLUTION
+            self._IR = np.empty_like(self._It)
+            self._IRw = np.empty(uw.shape[:-1] + self._hRw.shape, dtype=uw.dtype)
+        if self._i_gw is not None:
+            # -- BUFFERS OF THE RUNGE-KUTTA NONLINEAR SUBSTEP
+            self._v = np.empty_like(uw)
+            self._k = np.empty_like(uw)
+            self._acc = np.empty_like(uw)
+            self._c = np.empty_like(uw)
+
+    # -- PHASES OF A STEP, OVERRIDDEN PER INSTANCE BY A SolverProfiler
+    _FT = staticmethod(FT)
+    _IFT = staticmethod(IFT)
+    _phaseHooks = ("singleStep", "multiStep", "_FT", "_IFT", "_lin", "_nlin", "_kerr")
+
+    def _lin(self, uw, e_fac):
+        r"""Linear step in frequency domain, performed in place
+
+        Args:
+            uw (:obj:`numpy.ndarray`): Frequency domain representation of the
+            field (overwritten).
+            e_fac (:obj:`numpy.ndarray`): Linear propagator.
+
+        Returns:
+            :obj:`numpy.ndarray`: Updated field `uw`.
+        """
+        uw *= e_fac
+        return uw
+
+    def _potential(self, ut):
+        r"""Nonlinear potential :math:`\int R(t') |u(t-t')|^2 dt'`
+
+        Reduces to :math:`|u|^2` without Raman response.
 
-    def solve(self, u):
+        Args:
+            ut (:obj:`numpy.ndarray`): Time domain representation of the
+            field.
+
+        Returns:
+            :obj:`numpy.ndarray`: Potential, stored in the work array `_It`.
+        """
+        It = self._It
+        np.abs(ut, out=It)
+        np.square(It, out=It)
+        if self._hRw is None:
+            return It
+        IR, IRw = self._IR, self._IRw
+        RFFT(It, out=IRw)
+        IRw *= self._hRw
+        IRFFT(IRw, n=It.shape[-1], out=IR)
+        It *= 1.0 - self.fR
+        IR *= self.fR
+        It += IR
+        return It
+
+    def _kerr(self, ut):
+        r"""Nonlinear term :math:`u \int R(t') |u(t-t')|^2 dt'` in time domain,
+        computed in place
+
+        Reduces to the Kerr nonlinearity :math:`|u|^2 u` without Raman
+        response.
+
+        Args:
+            ut (:obj:`numpy.ndarray`): Time domain representation of the
+            field (overwritten).
+
+        Returns:
+            :obj:`numpy.ndarray`: Updated field `ut`.
+        """
+        if self._hRw is None:
+            return kernels.kerr(ut, self._It)
+        ut *= self._potential(ut)
+        return ut
+
+    def _nlin(self, ut, g_dz):
+        r"""Nonlinear step in time domain, performed in place
+
+        Multiplies the time-domain field by the phase factor
+        :math:`\exp(i \gamma |u|^2 dz)`, evaluated by the kernel backend
+        selected in module `kernels`. With Raman response, :math:`|u|^2` is
+        replaced by the potential computed by `_potential`.
+
+        Args:
+            ut (:obj:`numpy.ndarray`): Time domain representation of the
+            field (overwritten).
+            g_dz (:obj:`float` or :obj:`numpy.ndarray`): Product of
+            nonlinear coefficient and stepsize.
+
+        Returns:
+            :obj:`numpy.ndarray`: Updated field `ut`.
+        """
+        if self._hRw is None:
+            return kernels.nlin(ut, g_dz, self._It, self._ph)
+        It, ph = self._potential(ut), self._ph
+        It *= g_dz
+        np.cos(It, out=ph.real)
+        np.sin(It, out=ph.imag)
+        ut *= ph
+        return ut
+
+    def _dudz(self, uw, k, c, a=None):
+        r"""Nonlinear part of the field derivative, evaluated in place
+
+        Computes :math:`c\,\mathcal{F}[u \int R(t') |u(t-t')|^2 dt'] -
+        \mathcal{F}[a u]` for the frequency domain field `uw` and stores the
+        result in `k`. The absorption term, with time-domain absorption rate
+        `a` (None without absorber), takes one additional FFT.
+        """
+        ut = self._IFT(uw, out=self._ut)
+        if a is not None:
+            np.multiply(ut, a, out=self._uA)
+        ut = self._kerr(ut)
+        self._FT(ut, out=k)
+        k *= c
+        if a is not None:
+            k -= self._FT(self._uA, out=self._ph)
+        return k
+
+    def _nlinStep(self, uw, g_dz, a_fac=None):
+        r"""Nonlinear substep of the splitting solvers, performed in place
+
+        Transforms the field to the time domain, applies `_nlin`, and
+        transforms back. A time-domain absorber is applied as damping factor
+        before and after `_nlin`. With self-steepening, the substep is
+        instead integrated by an explicit Runge-Kutta step in the frequency
+        domain, including the absorption term: the midpoint rule (two
+        evaluations) if `_nlinOrder` is 2, which suffices for splitting
+        solvers of up to second order, and the classical 4th order method
+        otherwise.
+
+        Args:
+            uw (:obj:`numpy.ndarray`): Frequency domain representation of the
+            field (overwritten).
+            g_dz (:obj:`float` or :obj:`numpy.ndarray`): Product of
+            nonlinear coefficient and stepsize.
+            a_fac (:obj:`list`): Time-domain absorber of the substep, see
+            `_absorber` (default: None, i.e. no absorber).
+
+        Returns:
+            :obj:`numpy.ndarray`: Updated field `uw`.
+        """
+        if self._i_gw is None:
+            ut = self._IFT(uw, out=self._ut)
+            if a_fac is not None:
+                ut *= a_fac[0]
+            ut = self._nlin(ut, g_dz)
+            if a_fac is not None:
+                ut *= a_fac[0]
+            return self._FT(ut, out=uw)
+        v, k, acc, c = self._v, self._k, self._acc, self._c
+        a = None if a_fac is None else a_fac[1]
+        np.multiply(self._i_gw, g_dz, out=c)
+        self._dudz(uw, k, c, a)
+        if self._nlinOrder == 2:
+            np.multiply(k, 0.5, out=v)
+            v += uw
+            self._dudz(v, k, c, a)
+            uw += k
+            return uw
+        np.multiply(k, 1.0 / 6, out=acc)
+        np.multiply(k, 0.5, out=v)
+        v += uw
+        self._dudz(v, k, c, a)
+        k *= 1.0 / 3
+        acc += k
+        np.multiply(k, 1.5, out=v)
+        v += uw
+        self._dudz(v, k, c, a)
+        k *= 1.0 / 3
+        acc += k
+        np.multiply(k, 3.0, out=v)
+        v += uw
+        self._dudz(v, k, c, a)
+        k *= 1.0 / 6
+        acc += k
+        uw += acc
+        return uw
+
+    def propagate(self, u):
+        r"""Propagate field, yielding the field every `nSkip` steps
+
+        Generator form of `solve` that does not store any data. The field at
+        :math:`z_0`, after every `nSkip`-th step and at the last
+        :math:`z`-value is yielded, so that it can
+        be reduced, written to disk or plotted while the propagation
+        proceeds. Memory consumption is independent of the number of
+        yielded states.
+
+        Note:
+            The yielded array is the working array of the solver, which is
+            overwritten by subsequent steps. Copy it to retain the data.
+
+        Args:
+            u (:obj:`numpy.ndarray`, 1-dim or 2-dim):
+                Time-domain representation of initial field, or batch of
+                initial fields of shape `(n_runs, Nt)`.
+
+        Yields:
+            :obj:`tuple`: (z, uw), where `z` (:obj:`float`) is the current
+            :math:`z`-position and `uw` (:obj:`numpy.ndarray`) is the
+            frequency domain representation of the field.
+        """
+        u = np.asarray(u)
+        if u.ndim not in (1, 2) or u.shape[-1] != self.t.size:
+            raise ValueError(
+                "initial field must have shape (Nt,) or (n_runs, Nt) with Nt=%d, "
+                "got %s" % (self.t.size, u.shape)
+            )
+        uw = FT(u.astype(self.dtype, copy=False)).astype(self.dtype, copy=False)
+        self._initWorkArrays(uw)
+        self.nSteps = 0
+        if self._diag is not None:
+            self._diag.attach(self, uw)
+            self._diag.record(self.z_[0], uw)
+        yield self.z_[0], uw
+        yield from self._propagate(uw)
+
+    def _propagate(self, uw, i=0, n=0, k=None):
+        r"""Propagate field from a given position, yielding the field every
+        `nSkip` steps
+
+        Args:
+            uw (:obj:`numpy.ndarray`): Frequency domain representation of the
+            field at the current position (overwritten).
+            i (:obj:`int`): Index of the current position in `z_` (fixed
+            stepsize).
+            n (:obj:`int`): Current position in units of
+            :math:`dz/2^{maxRefine}` (adaptive stepsize).
+            k (:obj:`int`): Current stepsize exponent (adaptive stepsize).
+
+        Yields:
+            :obj:`tuple`: (z, uw), see `propagate`.
+        """
+        if self.tol is not None:
+            yield from self._propagateAdaptive(uw, n, k)
+            return
+        ckpt, diag, nSkip, nz = self._ckpt, self._diag, self.nSkip, self.z_.size
+        while i < nz - 1:
+            # -- ADVANCE TO THE NEXT STORED STATE, DIAGNOSTICS RECORD, OR
+            # -- CHECKPOINT DUE, IN A SINGLE CALL
+            m = min((i // nSkip + 1) * nSkip, nz - 1) - i
+            if diag is not None:
+                m = min(m, (i // diag.every + 1) * diag.every - i)
+            if ckpt is not None:
+                m = min(m, self._checkpointSteps())
+            uw = self.multiStep(uw, m)
+            self.nSteps += m
+            i += m
+            if diag is not None and i % diag.every == 0:
+                diag.record(self.z_[i], uw)
+            if i % nSkip == 0 or i == nz - 1:
+                yield self.z_[i], uw
+            if ckpt is not None and self._checkpointDue():
+                self._writeCheckpoint(uw, i=i)
+
+    def _checkpointSteps(self):
+        r"""Number of steps until the next checkpoint is due
+
+        A checkpoint due by wall-clock time is converted to a number of steps
+        via the step rate measured since the last checkpoint. Right after a
+        checkpoint, a single step is taken to measure the rate.
+        """
+        _, nSteps, seconds, (n0, t0) = self._ckpt
+        m = self.z_.size
+        if nSteps:
+            m = max(nSteps - (self.nSteps - n0), 1)
+        if seconds:
+            elapsed = time.monotonic() - t0
+            if self.nSteps == n0 or elapsed <= 0.0:
+                return 1
+            rate = (self.nSteps - n0) / elapsed
+            m = min(m, max(int(np.ceil((seconds - elapsed) * rate)), 1))
+        return m
+
+    def _checkpointDue(self):
+        r"""Check whether a checkpoint needs to be written"""
+        _, nSteps, seconds, (n0, t0) = self._ckpt
+        if (nSteps and self.nSteps - n0 >= nSteps) or (
+            seconds and time.monotonic() - t0 >= seconds
+        ):
+            self._ckpt[3] = (self.nSteps, time.monotonic())
+            return True
+        return False
+
+    def _writeCheckpoint(self, uw, i=0, n=0, k=None):
+        r"""Write checkpoint to disk
+
+        The checkpoint is first written to a temporary file that replaces
+        an existing checkpoint only once it is complete.
+
+        Args:
+            uw (:obj:`numpy.ndarray`): Frequency domain representation of the
+            field at the current position.
+            i, n, k (:obj:`int`): Current position, see `_propagate`.
+        """
+        path = self._ckpt[0]
+        mmap = isinstance(self._u, np.memmap)
+        if mmap:
+            self._u.flush()
+        data = {
+            "solver": self,
+            "uw": uw,
+            "i": i,
+            "n": n,
+            "k": k,
+            "nSteps": self.nSteps,
+            "diagnostics": self._diag,
+            "z": self.z,
+            "u": None if mmap else self._u[: self._nStored],
+            "storage": self._u.filename if mmap else None,
+        }
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+
+    def _restart(self, path):
+        r"""Restore state from checkpoint
+
+        Args:
+            path (:obj:`str`): Name of checkpoint file.
+
+        Returns:
+            :obj:`generator`: Continued propagation, see `_propagate`.
+        """
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+        uw = data["uw"]
+        if type(data["solver"]) is not type(self) or uw.shape[-1] != self.t.size:
+            raise ValueError(
+                "checkpoint '%s' was written by %s with Nt=%d"
+                % (path, type(data["solver"]).__name__, uw.shape[-1])
+            )
+        # -- GRIDS AND COEFFICIENTS MUST MATCH, SO THAT HISTORIES ARE NOT MIXED
+        for name in ("z_", "w", "beta", "gamma", "dtype", "nSkip"):
+            a, b = getattr(data["solver"], name), getattr(self, name)
+            if np.shape(a) != np.shape(b) or not np.array_equal(a, b):
+                raise ValueError(
+                    "checkpoint '%s' was written with a different %s" % (path, name)
+                )
+        self.reset()
+        nStored = data["z"].size
+        if data["storage"] is not None:
+            self._u = np.lib.format.open_memmap(data["storage"], mode="r+")
+            self._z = np.empty(self._u.shape[0], dtype=float)
+        elif nStored:
+            self._initStorage(data["u"][0])
+            self._u[:nStored] = data["u"]
+        self._z[:nStored] = data["z"]
+        self._nStored = nStored
+        self._utz = None
+        self.nSteps = data["nSteps"]
+        if self._diag is not None and data.get("diagnostics") is not None:
+            self._diag.load(data["diagnostics"])
+        self._initWorkArrays(uw)
+        return self._propagate(uw, data["i"], data["n"], data["k"])
+
+    def solve(
+        self,
+        u=None,
+        callback=None,
+        store=True,
+        path=None,
+        checkpoint=None,
+        nCheckpoint=None,
+        tCheckpoint=None,
+        restart=None,
+        profiler=None,
+        diagnostics=None,
+    ):
         r"""Propagate field
 
+        A batch of initial conditions can be supplied as 2-dim array of shape
+        `(n_runs, Nt)`. All members of the batch are propagated in lockstep,
+        with FFTs performed along the last axis. In this case, `uwz` and
+        `utz` are 3-dim arrays of shape `(n_snapshots, n_runs, Nt)`.
+
+        Since the number of stored states is known in advance, storage for
+        all states is allocated at once, either in memory or, if `path` is
+        given, as memory-mapped `.npy` file. States stored by a previous
+        call are discarded.
+
         Args:
-            u (:obj:`numpy.ndarray`):
-                Time-domain representation of initial field.
+            u (:obj:`numpy.ndarray`, 1-dim or 2-dim):
+                Time-domain representation of initial field, or batch of
+                initial fields (ignored if `restart` is given).
+            callback (:obj:`callable`):
+                Observer called as `callback(z, uw)` for every kept state
+                (default: None). The array `uw` is overwritten by subsequent
+                steps.
+            store (:obj:`bool`):
+                Store kept states in `uwz` (default: True).
+            path (:obj:`str`):
+                Name of `.npy` file used as memory-mapped storage for the
+                kept states (default: None, i.e. keep states in memory). The
+                file can be read via `numpy.load(path, mmap_mode="r")`.
+            checkpoint (:obj:`str`):
+                Name of checkpoint file (default: None, i.e. no
+                checkpoints).
+            nCheckpoint (:obj:`int`):
+                Write a checkpoint every `nCheckpoint` steps (default: None).
+            tCheckpoint (:obj:`float`):
+                Write a checkpoint every `tCheckpoint` seconds of wall-clock
+                time (default: None). Runs of steps merged into a single call
+                of `multiStep` are bounded via the measured step rate, so that
+                checkpoints are written in time.
+            restart (:obj:`str`):
+                Name of checkpoint file from which to resume an interrupted
+                run (default: None). See also `load_checkpoint`.
+            profiler (:obj:`SolverProfiler`):
+                Collects per-phase timings and reports progress during the
+                run (default: None). See module `profiler`.
+            diagnostics (:obj:`Diagnostics`):
+                Records scalar quantities of the field every given number of
+                steps, independent of `nSkip` (default: None). See module
+                `diagnostics`. Upon restart, the records of the interrupted
+                run are continued.
         """
-        uw = FT(u)
-        self._z.append(self.z_[0])
-        self._u.append(uw)
-        for i in range(1, self.z_.size):
-            uw = self.singleStep(uw)
-            if i % self.nSkip == 0:
-                self._u.append(uw)
-                self._z.append(self.z_[i])
+        self._diag = diagnostics
+        if restart is None:
+            self.reset()
+            states = self.propagate(u)
+        else:
+            states = self._restart(restart)
+        if checkpoint is not None:
+            self._ckpt = [
+                checkpoint,
+                nCheckpoint,
+                tCheckpoint,
+                (self.nSteps, time.monotonic()),
+            ]
+        if profiler is not None:
+            profiler.attach(self)
+        try:
+            for z, uw in states:
+                if profiler is not None:
+                    t0 = time.perf_counter()
+                if store:
+                    v = self._reduce(uw)
+                    if self._nStored == 0:
+                        self._initStorage(v, path)
+                    self._u[self._nStored] = v
+                    self._z[self._nStored] = z
+                    self._nStored += 1
+                    # -- A utz CACHED BY THE CALLBACK LACKS THE NEW STATE
+                    self._utz = None
+                if profiler is not None:
+                    profiler.record(z, time.perf_counter() - t0)
+                if callback is not None:
+                    callback(z, uw)
+        finally:
+            self._ckpt = None
+            self._diag = None
+            if profiler is not None:
+                profiler.detach()
+        if isinstance(self._u, np.memmap):
+            self._u.flush()
+            self._saveGrid(self._u.filename)
+
+    def _saveGrid(self, path):
+        r"""Write the grids of the stored states next to their storage
+
+        The grids are written to `<path>_grid.npz`, where `<path>` is the
+        name of the `.npy` storage without suffix, holding the arrays `z`,
+        `t` and `w` (i.e. `z`, `tRec` and `wRec`), `wShift`, and `domain`,
+        which is "time" if the stored states are time-domain fields.
+
+        Args:
+            path (:obj:`str`): Name of `.npy` file holding the stored states.
+        """
+        np.savez(
+            os.path.splitext(path)[0] + "_grid.npz",
+            z=self.z,
+            t=self.tRec,
+            w=self.wRec,
+            wShift=self.wShift,
+            domain="time" if self._recT is not None else "frequency",
+        )
+
+    def _initStorage(self, uw, path=None):
+        r"""Allocate storage for all states kept upon propagation
+
+        Args:
+            uw (:obj:`numpy.ndarray`): Stored representation of the field,
+            see `_reduce`.
+            path (:obj:`str`): Name of `.npy` file used as memory-mapped
+            storage (default: None).
+        """
+        shape = (-(-(self.z_.size - 1) // self.nSkip) + 1,) + uw.shape
+        if path is None:
+            self._u = np.empty(shape, dtype=self.dtype)
+        else:
+            self._u = np.lib.format.open_memmap(
+                path, mode="w+", dtype=self.dtype, shape=shape
+            )
+        self._z = np.empty(shape[0], dtype=float)
+
+    def reset(self):
+        r"""Discard all stored states"""
+        self._z = np.empty(0, dtype=float)
+        self._u = np.empty((0, self.t.size), dtype=self.dtype)
+        self._nStored = 0
+        self._utz = None
+        self.nSteps = 0
+
+    def _stepDoubling(self, uw, h, uc, uf):
+        r"""Advance field by a coarse step and two fine steps
+
+        Args:
+            uw (:obj:`numpy.ndarray`): Frequency domain representation of the
+            field at the current :math:`z`-position (not modified).
+            h (:obj:`float`): Stepsize.
+            uc (:obj:`numpy.ndarray`): Buffer receiving the field obtained
+            by a single step of size `h` (overwritten).
+            uf (:obj:`numpy.ndarray`): Buffer receiving the field obtained
+            by two steps of size `h/2`.
+
+        Returns:
+            :obj:`float`: Relative local error estimate, maximized over the
+            members of a batch.
+        """
+        np.copyto(uc, uw)
+        np.copyto(uf, uw)
+        self._setStepsize(h)
+        self.singleStep(uc)
+        self._setStepsize(0.5 * h)
+        self.singleStep(uf)
+        self.singleStep(uf)
+        It = self._It
+        np.abs(uf, out=It)
+        np.square(It, out=It)
+        E = It.sum(axis=-1)
+        uc -= uf
+        np.abs(uc, out=It)
+        np.square(It, out=It)
+        return np.sqrt(np.max(It.sum(axis=-1) / E))
+
+    def _propagateAdaptive(self, uw, n=0, k=None):
+        r"""Propagate field with adaptive stepsize control, yielding the field
+        every `nSkip` grid steps
+
+        Positions are tracked as integers in units of :math:`dz/2^{maxRefine}`
+        and stepsizes are powers of two thereof, clipped so that each
+        :math:`z`-value at which the field is stored is met exactly.
+
+        Args:
+            uw (:obj:`numpy.ndarray`): Frequency domain representation of the
+            field at the current position (overwritten).
+            n (:obj:`int`): Current position in units of
+            :math:`dz/2^{maxRefine}` (default: 0).
+            k (:obj:`int`): Current stepsize exponent (default: None, i.e.
+            start with the grid spacing of `z`).
+
+        Yields:
+            :obj:`tuple`: (z, uw), see `propagate`.
+        """
+        tol, scale = self.tol, 2 ** self.maxRefine
+        unit = self._dz0 / scale
+        uc, uf = np.empty_like(uw), np.empty_like(uw)
+        ckpt = self._ckpt
+        # -- STEPSIZE EXPONENT
+        if k is None:
+            k = self.maxRefine
+        # -- GRID INDICES TO BE MET EXACTLY: STORED STATES AND DIAGNOSTICS,
+        # -- AND THE LAST z-VALUE
+        diag, nz = self._diag, self.z_.size
+        stride = self.nSkip if diag is None else np.gcd(self.nSkip, diag.every)
+        i0 = (n // (stride * scale) + 1) * stride
+        targets = list(range(i0, nz, stride))
+        if (nz - 1) % stride and n < (nz - 1) * scale:
+            targets.append(nz - 1)
+        try:
+            for i in targets:
+                target = i * scale
+                while n < target:
+                    if ckpt is not None and self._checkpointDue():
+                        self._writeCheckpoint(uw, n=n, k=k)
+                    j = min(k, (target - n).bit_length() - 1)
+                    err = self._stepDoubling(uw, 2 ** j * unit, uc, uf)
+                    if err > 2 * tol and j > 0:
+                        # -- REJECT STEP AND RETRY WITH HALVED STEPSIZE
+                        k = j - 1
+                        continue
+                    np.copyto(uw, uf)
+                    n += 2 ** j
+                    self.nSteps += 1
+                    if err > tol:
+                        k = max(j - 1, 0)
+                    elif err < 0.5 * tol and j == k:
+                        k = j + 1
+                if diag is not None and i % diag.every == 0:
+                    diag.record(self.z_[i], uw)
+                if i % self.nSkip == 0 or i == nz - 1:
+                    yield self.z_[i], uw
+        finally:
+            self._setStepsize(self._dz0)
 
     @property
     def utz(self):
-        r""":obj:`numpy.ndarray`, 2-dim: Time-domain representation of field"""
-        return IFT(np.asarray(self._u), axis=-1)
+        r""":obj:`numpy.ndarray`, 2-dim: Time-domain representation of field
+        on `tRec` (3-dim for batched propagation). Computed upon first access
+        and cached until the next call to `solve`"""
+        if self._utz is None:
+            self._utz = self._toTime(self._u[: self._nStored])
+        return self._utz
+
+    @property
+    def utzView(self):
+        r""":obj:`TimeDomainView`: Lazily evaluated time-domain representation
+        of field, transforming only the requested states"""
+        return TimeDomainView(self)
+
+    def nearestIndex(self, z):
+        r"""Index of the stored state closest to a given :math:`z`-position
+
+        Args:
+            z (:obj:`float`): :math:`z`-position.
+
+        Returns:
+            :obj:`int`: Index into `z`, `uwz` and `utz`.
+        """
+        return int(np.argmin(np.abs(self.z - z)))
+
+    def utAt(self, z):
+        r"""Time-domain representation of the stored state closest to `z`
+
+        Args:
+            z (:obj:`float`): :math:`z`-position.
+
+        Returns:
+            :obj:`numpy.ndarray`: Field at the stored :math:`z`-position
+            closest to `z` (new array).
+        """
+        return np.array(self.utzView[self.nearestIndex(z)])
+
+    def uwAt(self, z):
+        r"""Frequency-domain representation of the stored state closest to `z`
+
+        Args:
+            z (:obj:`float`): :math:`z`-position.
+
+        Returns:
+            :obj:`numpy.ndarray`: Field at the stored :math:`z`-position
+            closest to `z` (new array).
+        """
+        u = self._u[self.nearestIndex(z)]
+        return FT(u, axis=-1) if self._recT is not None else np.array(u)
 
     @property
     def uwz(self):
         r""":obj:`numpy.ndarray`, 2-dim: Frequency-domain representation of
-        field"""
-        return np.asarray(self._u)
+        field on `wRec` (3-dim for batched propagation). View of the internal
+        storage, no copy is made, unless states are stored in the time
+        domain"""
+        if self._recT is not None:
+            return FT(self._u[: self._nStored], axis=-1)
+        return self._u[: self._nStored]
 
     @property
     def z(self):
         r""":obj:`numpy.ndarray`, 1-dim: :math:`z`-slices at which field is
         stored"""
-        return np.asarray(self._z)
+        return self._z[: self._nStored]
 
     def singleStep(self, uw):
         r"""Advance field by a single :math:`z`-slice"""
         raise NotImplementedError
 
+    def multiStep(self, uw, m):
+        r"""Advance field by `m` consecutive :math:`z`-slices
+
+        Used by the fixed stepsize driver to advance the field between two
+        stored states. Subclasses may override this method to fuse
+        operations of adjacent steps, e.g. linear substeps.
+
+        Args:
+            uw (:obj:`numpy.ndarray`): Frequency domain representation of the
+            field at the current :math:`z`-position (overwritten).
+            m (:obj:`int`): Number of steps.
+
+        Returns:
+            :obj:`numpy.ndarray`: Frequency domain representation of the field
+            at :math:`z` + :math:`m dz`.
+        """
+        for _ in range(m):
+            uw = self.singleStep(uw)
+        return uw
+
+
+class TimeDomainView:
+    r"""Lazily evaluated time-domain representation of stored states.
+
+    Indexing along the first axis selects stored states, only these are
+    transformed to the time domain. Remaining indices apply to the
+    transformed data. If the solver already holds a cached `utz`, it is
+    used instead.
+
+    Args:
+        solver (:obj:`SolverBaseClass`): Solver holding the stored states.
+    """
+
+    def __init__(self, solver):
+        self._solver = solver
+
+    def __len__(self):
+        return self._solver._nStored
+
+    @property
+    def shape(self):
+        r""":obj:`tuple`: Shape of the time-domain representation"""
+        solver = self._solver
+        return solver._u[: solver._nStored].shape[:-1] + solver.tRec.shape
+
+    def __getitem__(self, key):
+        if self._solver._utz is not None:
+            return self._solver._utz[key]
+        if not isinstance(key, tuple):
+            key = (key,)
+        solver = self._solver
+        ut = solver._toTime(solver._u[: solver._nStored][key[0]])
+        if len(key) == 1:
+            return ut
+        if np.ndim(key[0]) == 0 and not isinstance(key[0], slice):
+            return ut[key[1:]]
+        return ut[(slice(None),) + key[1:]]
+
+    def zRange(self, z_min, z_max):
+        r"""Stored states within a :math:`z`-range
+
+        Args:
+            z_min (:obj:`float`): Lower bound of :math:`z`-range.
+            z_max (:obj:`float`): Upper bound of :math:`z`-range.
+
+        Returns:
+            :obj:`tuple`: (z, utz), where `z` are the :math:`z`-positions of
+            the stored states in [z_min, z_max] and `utz` is the
+            time-domain representation of the field at these positions.
+        """
+        z = self._solver.z
+        mask = (z >= z_min) & (z <= z_max)
+        return z[mask], self[mask]
+
+
+def load_checkpoint(path):
+    r"""Restore solver from checkpoint.
+
+    Creates a solver with the configuration stored in a checkpoint written
+    by `SolverBaseClass.solve`. The interrupted run is resumed via
+    `solver.solve(restart=path)`.
+
+    Args:
+        path (:obj:`str`): Name of checkpoint file.
+
+    Returns:
+        :obj:`SolverBaseClass`: Solver instance.
+    """
+    with open(path, "rb") as f:
+        return pickle.load(f)["solver"]
+
+
+def group_velocity(w, beta, wRef):
+    r"""Group velocity :math:`1/\beta_1` at a reference frequency
+
+    Args:
+        w (:obj:`numpy.ndarray`): Angular frequency grid (in FFT order).
+        beta (:obj:`numpy.ndarray`): Propagation constant on `w`, or batch
+        of propagation constants of shape `(n_runs, Nt)`.
+        wRef (:obj:`float`): Reference angular frequency.
+
+    Returns:
+        :obj:`float` or :obj:`numpy.ndarray`: Group velocity, of shape
+        `(n_runs, 1)` for a batch.
+    """
+    idx = np.argsort(w)
+    beta = np.asarray(beta)
+    b1 = np.gradient(beta[..., idx], w[idx], axis=-1)
+    res = np.array([np.interp(wRef, w[idx], row) for row in b1.reshape(-1, w.size)])
+    return 1.0 / res[0] if beta.ndim == 1 else 1.0 / res[:, np.newaxis]
+
+
+def absorbing_layer(x, xMin, xMax, strength, order=2, kind="polynomial"):
+    r"""Absorption rate profile of absorbing layers outside an interval
+
+    Args:
+        x (:obj:`numpy.ndarray`): Grid, e.g. temporal or angular frequency
+        grid.
+        xMin, xMax (:obj:`float`): Bounds of the interval that is kept free
+        of absorption.
+        strength (:obj:`float`): Maximal absorption rate (per unit length).
+        order (:obj:`int`): Order of the profile (default: 2).
+        kind (:obj:`str`): Shape of the profile (default: "polynomial"),
+            either "polynomial", i.e. a complex absorbing potential rising
+            as :math:`d^{order}` with the distance :math:`d` from the
+            interval and reaching `strength` at the edges of the grid, or
+            "supergaussian", i.e. `strength` times
+            :math:`1 - \exp(-|(x-x_c)/h|^{order})` with center :math:`x_c`
+            and half width :math:`h` of the interval. The latter is smooth
+            but nonzero inside the interval, use a large `order`.
+
+    Returns:
+        :obj:`numpy.ndarray`: Absorption rate on `x`.
+    """
+    x = np.asarray(x, dtype=float)
+    if kind == "polynomial":
+        dLo = np.clip(xMin - x, 0.0, None)
+        dHi = np.clip(x - xMax, 0.0, None)
+        res = np.zeros_like(x)
+        for d in (dLo, dHi):
+            if d.max() > 0:
+                res += strength * (d / d.max()) ** order
+        return res
+    if kind == "supergaussian":
+        xc, hw = 0.5 * (xMin + xMax), 0.5 * (xMax - xMin)
+        return strength * (1.0 - np.exp(-(np.abs((x - xc) / hw) ** order)))
+    raise ValueError("unknown absorber kind '%s'" % kind)
+
+
+def raman_response(t, tau1=12.2, tau2=32.0):
+    r"""Raman response function of fused silica
+
+    Implements the single-oscillator model of Blow and Wood,
+
+    .. math::
+        h_R(t) = \frac{\tau_1^2 + \tau_2^2}{\tau_1 \tau_2^2}
+        e^{-t/\tau_2} \sin(t/\tau_1), \quad t \geq 0.
+
+    Args:
+        t (:obj:`numpy.ndarray`): Delay times (fs).
+        tau1 (:obj:`float`): Inverse phonon frequency (default: 12.2 fs).
+        tau2 (:obj:`float`): Phonon lifetime (default: 32.0 fs).
+
+    Returns:
+        :obj:`numpy.ndarray`: Response function, zero for negative delays.
+    """
+    t = np.asarray(t, dtype=float)
+    h = (tau1 ** 2 + tau2 ** 2) / tau1 / tau2 ** 2 * np.exp(-t / tau2) * np.sin(t / tau1)
+    return np.where(t >= 0, h, 0.0)
+
 
 class SimpleSplitStepSolver(SolverBaseClass):
     r"""Fixed stepsize algorithm implementing the simple split step
@@ -133,10 +1421,21 @@ class SimpleSplitStepSolver(SolverBaseClass):
         https://doi.org/10.1016/0021-9991(84)90003-2.
     """
 
+    _nlinOrder = 2
+
+    def _propagators(self, dz):
+        r"""Linear full step propagator and nonlinear phase coefficient"""
+        return {
+            "_e_fac": np.exp(1j * dz * self.beta),
+            "_g_dz": self.gamma * dz,
+            "_a_fac": self._absorber(dz),
+        }
+
     def singleStep(self, uw):
         r"""Advance field by a single :math:`z`-slice
 
         Implements simple splitting formula for split-step Fourier approach.
+        The field is advanced in place.
 
         Args:
             uw (:obj:`numpy.ndarray`): Frequency domain representation of the
@@ -146,16 +1445,11 @@ class SimpleSplitStepSolver(SolverBaseClass):
             :obj:`numpy.ndarray`: Frequency domain representation of the field
             at :math:`z` + :math:`dz`.
         """
-        # -- DECLARE CONVENIENT ABBREVIATIONS
-        dz, w, beta, gamma = self.dz, self.w, self.beta, self.gamma
-        e_fac = np.exp(1j * dz * beta)
-        # -- LINEAR STEP / FREQUENCY DOMAIN
-        _lin = lambda uw: e_fac * uw
         # -- NONLINEAR STEP / TIME DOMAIN
-        _nlin = lambda ut: np.exp(1j * gamma * np.abs(ut) ** 2 * dz) * ut
-
-        # -- ADVANCE FIELD
-        return _lin(FT(_nlin(IFT(uw))))
+        self._nlinStep(uw, self._g_dz, self._a_fac)
+        # -- LINEAR STEP / FREQUENCY DOMAIN
+        self._lin(uw, self._e_fac)
+        return uw
 
 
 class Symmetric_Split_Step_Solver(SolverBaseClass):
@@ -168,7 +1462,7 @@ class Symmetric_Split_Step_Solver(SolverBaseClass):
     References:
         [1] P. L. DeVries,
         Application of the Split Operator Fourier Transform method to the
-        solution of the nonlinear Schrödinger equation,
+        solution of the nonlinear Schrödinger equation,
         AIP Conference Proceedings 160, 269 (1987),
         https://doi.org/10.1063/1.36847.
 
@@ -179,10 +1473,23 @@ class Symmetric_Split_Step_Solver(SolverBaseClass):
         https://doi.org/10.1007/BF00882638.
     """
 
+    _nlinOrder = 2
+
+    def _propagators(self, dz):
+        r"""Linear half and full step propagators and nonlinear phase
+        coefficient"""
+        return {
+            "_e_half": np.exp(0.5j * dz * self.beta),
+            "_e_full": np.exp(1j * dz * self.beta),
+            "_g_dz": self.gamma * dz,
+            "_a_fac": self._absorber(dz),
+        }
+
     def singleStep(self, uw):
         r"""Advance field by a single :math:`z`-slice
 
         Implements symmetric splitting formula for split-step Fourier approach.
+        The field is advanced in place.
 
         Args:
             uw (:obj:`numpy.ndarray`): Frequency domain representation of the
@@ -192,18 +1499,39 @@ class Symmetric_Split_Step_Solver(SolverBaseClass):
             :obj:`numpy.ndarray`: Frequency domain representation of the field
             at :math:`z` + :math:`dz`.
         """
-
-        # -- DECLARE CONVENIENT ABBREVIATIONS
-        dz, w, beta, gamma = self.dz, self.w, self.beta, self.gamma
-        e_fac = np.exp(0.5j * dz * beta)
-
         # -- LINEAR HALF STEP / FREQUENCY DOMAIN
-        _linhalf = lambda uw: e_fac * uw
+        self._lin(uw, self._e_half)
         # -- NONLINEAR STEP / TIME DOMAIN
-        _nlin = lambda ut: np.exp(1j * gamma * np.abs(ut) ** 2 * dz) * ut
+        self._nlinStep(uw, self._g_dz, self._a_fac)
+        # -- LINEAR HALF STEP / FREQUENCY DOMAIN
+        self._lin(uw, self._e_half)
+        return uw
 
-        # -- ADVANCE FIELD
-        return _lin(FT(_nlin(IFT(_lin(uw)))))
+    def multiStep(self, uw, m):
+        r"""Advance field by `m` consecutive :math:`z`-slices
+
+        The trailing linear half step of each step and the leading linear
+        half step of the next one are merged into a single full step, so
+        that half steps are applied only at the ends of the sequence. The
+        result agrees with `m` calls to `singleStep` up to round-off.
+
+        Args:
+            uw (:obj:`numpy.ndarray`): Frequency domain representation of the
+            field at the current :math:`z`-position (overwritten).
+            m (:obj:`int`): Number of steps.
+
+        Returns:
+            :obj:`numpy.ndarray`: Frequency domain representation of the field
+            at :math:`z` + :math:`m dz`.
+        """
+        # -- LEADING LINEAR HALF STEP / FREQUENCY DOMAIN
+        self._lin(uw, self._e_half)
+        for n in range(m):
+            # -- NONLINEAR STEP / TIME DOMAIN
+            self._nlinStep(uw, self._g_dz, self._a_fac)
+            # -- MERGED LINEAR HALF STEPS / FREQUENCY DOMAIN
+            self._lin(uw, self._e_half if n == m - 1 else self._e_full)
+        return uw
 
 
 class Interaction_picture_method(SolverBaseClass):
@@ -212,7 +1540,13 @@ class Interaction_picture_method(SolverBaseClass):
     order method.
 
     Implements a fixed step size algorithm referred to as the Interaction picture
-    method as discussed in [1].
+    method as discussed in [1]. The interaction picture is centered at the
+    midpoint :math:`z + dz/2` of the step, so that the only propagator
+    required is the linear half step :math:`\exp(i \beta dz/2)` and the
+    stages 2 and 3 need no transformation at all. A step takes four
+    evaluations of the nonlinear part (8 FFTs, plus 8 real-input FFTs with
+    Raman response, see `nFFT`) and four multiplications by the half step
+    propagator.
 
     References:
         [1] Johan Hult,
@@ -221,11 +1555,47 @@ class Interaction_picture_method(SolverBaseClass):
         JOURNAL OF LIGHTWAVE TECHNOLOGY, VOL. 25, NO. 12, DECEMBER 2007,
     """
 
+    @property
+    def nFFT(self):
+        return 4 * self._nlinFFT(True)
+
+    def _propagators(self, dz):
+        r"""Linear half step propagator, nonlinear coefficient and
+        time-domain absorption rate"""
+        i_gamma = 1j * self.gamma if self._i_gw is None else self.gamma * self._i_gw
+        return {
+            "_e_half": np.exp(0.5j * self.beta * dz),
+            "_i_gamma": i_gamma,
+            "_aT": self.alphaT,
+        }
+
+    def _initWorkArrays(self, uw):
+        r"""Allocate work arrays for the Runge-Kutta stages
+
+        In addition to the buffers of the base class, allocates the stage
+        input `_v`, the stage derivative `_k`, and the accumulated increment
+        `_acc`.
+        """
+        super()._initWorkArrays(uw)
+        if getattr(self, "_k", None) is not None and self._k.shape == uw.shape:
+            return
+        self._v = np.empty_like(uw)
+        self._k = np.empty_like(uw)
+        self._acc = np.empty_like(uw)
+
     def singleStep(self, uw):
         r"""Advance field by a single :math:`z`-slice
 
         Implements Runge Kutta fourth order method for solving Nonlinear
-        SchrÖdinger Equation.
+        SchrÖdinger Equation in the formulation of Ref. [1], i.e.
+
+        .. math::
+            u_I &= D u, \quad k_1 = D N(u), \quad k_2 = N(u_I + k_1 dz/2),\\
+            k_3 &= N(u_I + k_2 dz/2), \quad k_4 = N(D(u_I + k_3 dz)),\\
+            u(z+dz) &= D(u_I + (k_1 + 2k_2 + 2k_3) dz/6) + k_4 dz/6,
+
+        with half step propagator :math:`D` and nonlinear part :math:`N`.
+        The field is advanced in place.
 
         Args:
             uw (:obj:`numpy.ndarray`): Frequency domain representation of the
@@ -235,23 +1605,199 @@ class Interaction_picture_method(SolverBaseClass):
             :obj:`numpy.ndarray`: Frequency domain representation of the field
             at :math:`z` + :math:`dz`.
         """
-
         # -- DECLARE CONVENIENT ABBREVIATIONS
-        dz, w, beta, gamma = self.dz, self.w, self.beta, self.gamma
-
-        def dudz(z, uw):
-            r"""Derivative of Electric field envelope 'u' in frequency domain
-            with respect to :math 'z'
-            """
-            ut = IFT(np.exp(1j * beta * z) * uw)
-            return np.exp(-1j * beta * z) * 1j * gamma * FT(np.abs(ut) ** 2 * ut)
-
-        def Runge_Kutta_4(uw):
-            r"""Implements Runge Kutta 4th order formula"""
-            k1 = dudz(0, uw)
-            k2 = dudz(dz / 2, uw + dz * k1 / 2)
-            k3 = dudz(dz / 2, uw + dz * k2 / 2)
-            k4 = dudz(dz, uw + dz * k3)
-            return uw + dz * (k1 + 2 * k2 + 2 * k3 + k4) / 6
-
-        return np.exp(1j * beta * dz) * (Runge_Kutta_4(uw))
+        dz, e_half, v, k, acc = float(self.dz), self._e_half, self._v, self._k, self._acc
+        i_gamma, aT = self._i_gamma, self._aT
+
+        # -- STAGE 1: z = 0, TRANSFORMED TO THE MIDPOINT; uw HOLDS u_I
+        self._dudz(uw, k, i_gamma, aT)
+        self._lin(k, e_half)
+        self._lin(uw, e_half)
+        np.multiply(k, dz / 6, out=acc)
+        np.multiply(k, dz / 2, out=v)
+        v += uw
+        # -- STAGE 2: z = dz/2
+        self._dudz(v, k, i_gamma, aT)
+        np.multiply(k, dz / 2, out=v)
+        v += uw
+        k *= dz / 3
+        acc += k
+        # -- STAGE 3: z = dz/2
+        self._dudz(v, k, i_gamma, aT)
+        np.multiply(k, dz, out=v)
+        v += uw
+        k *= dz / 3
+        acc += k
+        # -- STAGE 4: z = dz
+        self._lin(v, e_half)
+        self._dudz(v, k, i_gamma, aT)
+
+        # -- ADVANCE FIELD
+        uw += acc
+        self._lin(uw, e_half)
+        k *= dz / 6
+        uw += k
+        return uw
+
+
+def _strang_composition(weights):
+    r"""Splitting coefficients of a composition of symmetric split steps
+
+    Composes symmetric split steps with stepsizes :math:`w_i h` and fuses
+    the linear half steps of adjacent split steps into a single linear step.
+
+    Args:
+        weights (:obj:`list`): Relative stepsizes :math:`w_i`.
+
+    Returns:
+        :obj:`tuple`: (a, b), coefficients of the linear and nonlinear
+        substeps, see `CompositionSplitStepSolver`.
+    """
+    w = [0.0] + list(weights) + [0.0]
+    a = [0.5 * (w[i] + w[i + 1]) for i in range(len(w) - 1)]
+    return tuple(a), tuple(weights)
+
+
+class CompositionSplitStepSolver(SolverBaseClass):
+    r"""Fixed stepsize algorithm implementing a higher-order split step
+    method by composition.
+
+    Advances the field by the sequence of substeps
+
+    .. math::
+        e^{a_0 h \hat{L}}\, e^{b_0 h \hat{N}}\, e^{a_1 h \hat{L}} \cdots
+        e^{b_{m-1} h \hat{N}}\, e^{a_m h \hat{L}},
+
+    where :math:`\hat{L}` is the linear part, solved in the frequency
+    domain, and :math:`\hat{N}` is the nonlinear part, solved in the time
+    domain. Adjacent linear substeps are fused, so that each nonlinear
+    substep costs exactly one forward and one inverse FFT (without Raman
+    response and self-steepening, see `nFFT`). The propagators
+    of all substeps are precomputed.
+
+    Subclasses specify the coefficients via the class attributes `a` and
+    `b`.
+
+    Attributes:
+        a (:obj:`tuple`): Coefficients of the linear substeps.
+        b (:obj:`tuple`): Coefficients of the nonlinear substeps.
+    """
+
+    a = (0.5, 0.5)
+    b = (1.0,)
+
+    @property
+    def _nlinSubsteps(self):
+        return len(self.b)
+
+    def _propagators(self, dz):
+        r"""Propagators of all linear substeps, nonlinear phase
+        coefficients and absorber factors of all nonlinear substeps"""
+        e_fac = {a: np.exp(1j * a * dz * self.beta) for a in set(self.a)}
+        return {
+            "_e_facs": [e_fac[a] for a in self.a],
+            "_g_dzs": [self.gamma * b * dz for b in self.b],
+            "_a_facs": [self._absorber(b * dz) for b in self.b],
+        }
+
+    def singleStep(self, uw):
+        r"""Advance field by a single :math:`z`-slice
+
+        Implements the composition of linear and nonlinear substeps. The
+        field is advanced in place.
+
+        Args:
+            uw (:obj:`numpy.ndarray`): Frequency domain representation of the
+            field at the current :math:`z`-position.
+
+        Returns:
+            :obj:`numpy.ndarray`: Frequency domain representation of the field
+            at :math:`z` + :math:`dz`.
+        """
+        e_facs, g_dzs, a_facs = self._e_facs, self._g_dzs, self._a_facs
+        self._lin(uw, e_facs[0])
+        for i in range(len(g_dzs)):
+            # -- NONLINEAR SUBSTEP / TIME DOMAIN
+            self._nlinStep(uw, g_dzs[i], a_facs[i])
+            # -- LINEAR SUBSTEP / FREQUENCY DOMAIN
+            self._lin(uw, e_facs[i + 1])
+        return uw
+
+
+class Yoshida4SplitStepSolver(CompositionSplitStepSolver):
+    r"""Fourth-order split step method by Yoshida's triple jump.
+
+    Composes three symmetric split steps with relative stepsizes
+    :math:`w_1, w_0, w_1`, where :math:`w_1 = 1/(2-2^{1/3})` and
+    :math:`w_0 = 1 - 2 w_1` [1]. Requires 6 FFTs per step.
+
+    References:
+        [1] H. Yoshida,
+        Construction of higher order symplectic integrators,
+        Phys. Lett. A 150 (1990) 262,
+        https://doi.org/10.1016/0375-9601(90)90092-3.
+    """
+
+    _w1 = 1.0 / (2.0 - 2.0 ** (1.0 / 3.0))
+    a, b = _strang_composition([_w1, 1.0 - 2.0 * _w1, _w1])
+
+
+class Suzuki4SplitStepSolver(CompositionSplitStepSolver):
+    r"""Fourth-order split step method by Suzuki's fractal composition.
+
+    Composes five symmetric split steps with relative stepsizes
+    :math:`p, p, 1-4p, p, p`, where :math:`p = 1/(4-4^{1/3})` [1]. Requires 10
+    FFTs per step, but has a considerably smaller error constant than the
+    triple jump.
+
+    References:
+        [1] M. Suzuki,
+        Fractal decomposition of exponential operators with applications to
+        many-body theories and Monte Carlo simulations,
+        Phys. Lett. A 146 (1990) 319,
+        https://doi.org/10.1016/0375-9601(90)90962-N.
+    """
+
+    _p = 1.0 / (4.0 - 4.0 ** (1.0 / 3.0))
+    a, b = _strang_composition([_p, _p, 1.0 - 4.0 * _p, _p, _p])
+
+
+class Yoshida6SplitStepSolver(CompositionSplitStepSolver):
+    r"""Sixth-order split step method by Yoshida's composition.
+
+    Composes seven symmetric split steps with the relative stepsizes of
+    solution A in [1]. Requires 14 FFTs per step. With self-steepening, the
+    nonlinear substeps are integrated by the classical 4th order Runge-Kutta
+    method, which limits the order of the method to four.
+
+    References:
+        [1] H. Yoshida,
+        Construction of higher order symplectic integrators,
+        Phys. Lett. A 150 (1990) 262,
+        https://doi.org/10.1016/0375-9601(90)90092-3.
+    """
+
+    _w = [0.78451361047755726382, 0.23557321335935813368, -1.17767998417887100695]
+    _w0 = 1.0 - 2.0 * sum(_w)
+    a, b = _strang_composition(_w + [_w0] + _w[::-1])
+
+
+class BlanesMoan4SplitStepSolver(CompositionSplitStepSolver):
+    r"""Fourth-order optimized split step method by Blanes and Moan.
+
+    Implements the six-stage symmetric splitting scheme S6 of [1], with
+    coefficients optimized for a small error constant. Requires 12 FFTs per
+    step.
+
+    References:
+        [1] S. Blanes, P. C. Moan,
+        Practical symplectic partitioned Runge-Kutta and Runge-Kutta-Nyström
+        methods,
+        J. Comput. Appl. Math. 142 (2002) 313,
+        https://doi.org/10.1016/S0377-0427(01)00492-7.
+    """
+
+    _a = [0.0792036964311957, 0.353172906049774, -0.0420650803577195]
+    _b = [0.209515106613362, -0.143851773179818]
+    a = tuple(_a + [1.0 - 2.0 * sum(_a)] + _a[::-1])
+    b = tuple(_b + [0.5 - sum(_b)] * 2 + _b[::-1])
@@ -1,17 +1,53 @@
+import mmap
+import multiprocessing as mp
 import numpy as np
 import numpy.fft as nfft
+from concurrent.futures import ThreadPoolExecutor
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 import matplotlib.colors as col
 from .config import FT, IFT, FTFREQ, SHIFT
 
+# -- BATCH CONFIGURATION, INHERITED BY EACH WORKER PROCESS, SEE _batch_init
+_BATCH = None
 
-def spectrogram(t, w, ut, t_lim=None, Nt=1000, s0=20.0):
+
+def spectrogram(
+    t,
+    w,
+    ut,
+    t_lim=None,
+    Nt=1000,
+    s0=20.0,
+    dtype=np.complex128,
+    max_memory=2 ** 27,
+    workers=1,
+    out=None,
+    cutoff=None,
+    oversample=4,
+):
     """Compute spectrogram for time-domain input signal.
 
     Computes spectrogram of a time-domain input signal via short time Fourier
     transform employing a Gaussian window function.
 
+    Delay times are processed in blocks, so that the windowed signals and
+    their spectra take at most `max_memory` bytes of temporary storage per
+    worker, and the spectrogram is written block by block into a
+    preallocated array. Since each delay time is transformed independently,
+    the result does not depend on the block size or the number of workers.
+
+    Given a `cutoff`, the window function is truncated at `cutoff` widths
+    `s0` about each delay time, and only its support of :math:`L` samples
+    is transformed by an FFT of length :math:`n \geq` `oversample` :math:`L`
+    (zero-padded to a power of two). This reduces the cost per delay time
+    from :math:`O(N_t \log N_t)` to :math:`O(n \log n)`, besides writing
+    the output. The small FFT covers the same frequency range with coarser
+    spacing :math:`2\pi/(n\,dt)`; its squared magnitude is mapped onto the
+    grid `SHIFT(w)` by linear interpolation. For the default `oversample`,
+    interpolation errors are of the order of 0.5% of the maximum of the
+    spectrogram, doubling `oversample` reduces them fourfold.
+
     Args:
         t (:obj:`numpy.array`, 1-dim):
               Temporal grid.
@@ -28,6 +64,29 @@ def spectrogram(t, w, ut, t_lim=None, Nt=1000, s0=20.0):
         s0 (:obj:`float`):
               Root-mean-square width of Gaussian function used for signal
               localization (default: s0=20.0).
+        dtype (:obj:`numpy.dtype`):
+              Complex data type used for the short time Fourier transform,
+              numpy.complex128 (default) or numpy.complex64. The spectrogram
+              is returned in the corresponding real type.
+        max_memory (:obj:`int`):
+              Bound on the temporary storage in bytes used per worker
+              (default: 2**27, i.e. 128 MiB). At least one delay time is
+              processed at once.
+        workers (:obj:`int`):
+              Number of threads processing blocks of delay times
+              (default: 1).
+        out (:obj:`numpy.ndarray`, 2-dim):
+              Array of shape `(w.size, Nt)` and real type receiving the
+              spectrogram, e.g. a memory-mapped array (default: None, i.e.
+              a new array is allocated).
+        cutoff (:obj:`float`):
+              Number of widths `s0` at which the window function is
+              truncated on either side (default: None, i.e. no truncation).
+              Values of about 6 or larger leave the spectrogram unaffected
+              on the scale of the plots.
+        oversample (:obj:`int`):
+              Minimal ratio of FFT length and window support for truncated
+              windows (default: 4).
 
     Returns:
         :obj:`list`: (t_spec, w_spec, P_tw), where `t_seq`
@@ -35,17 +94,272 @@ def spectrogram(t, w, ut, t_lim=None, Nt=1000, s0=20.0):
         (:obj:`numpy.ndarray`, 1-dim) are angular frequencies, and `P_tw`
         (:obj:`numpy.ndarray`, 2-dim) is the spectrogram.
     """
-    if t_lim == None:
-        t_min, t_max = np.min(t), np.max(t)
+    stft = _ShortTimeFT(t, w, t_lim, Nt, s0, dtype, max_memory, cutoff, oversample)
+    # -- OUTPUT, FILLED ROW BY ROW FOR EACH DELAY TIME
+    if out is None:
+        P = np.empty((Nt, t.size), dtype=stft.rdtype)
     else:
-        t_min, t_max = t_lim
-    # -- DELAY TIMES
-    t_seq = np.linspace(t_min, t_max, Nt)
-    # -- WINDOW FUNCTION
-    h = lambda t: np.exp(-(t ** 2) / 2 / s0 / s0) / np.sqrt(2.0 * np.pi * s0 * s0)
-    # -- COMPUTE TIME-FREQUENCY RESOLVED CONTENT OF INPUT FIELD
-    P = np.abs(FT(h(t - t_seq[:, np.newaxis]) * ut[np.newaxis, :], axis=-1)) ** 2
-    return t_seq, SHIFT(w), np.swapaxes(SHIFT(P, axes=-1), 0, 1)
+        P = np.swapaxes(out, 0, 1)
+    stft(ut, P, workers)
+    return stft.t_seq, SHIFT(w), np.swapaxes(P, 0, 1)
+
+
+def batch_spectrogram(
+    t,
+    w,
+    utz,
+    z_ids=None,
+    t_lim=None,
+    Nt=1000,
+    s0=20.0,
+    dtype=np.complex128,
+    max_memory=2 ** 27,
+    cutoff=None,
+    oversample=4,
+    workers=None,
+    path=None,
+):
+    """Compute spectrograms for a sequence of time-domain signals.
+
+    Computes the spectrograms of selected rows of `utz`, e.g. the stored
+    states of a propagation run, using the same setup as `spectrogram`. The
+    windows of all delay times (the gate matrix) are computed only once and
+    the rows are distributed over a pool of worker processes, each writing
+    its spectrograms directly into the shared output array.
+
+    Note:
+        Worker processes are forked, so that the gate matrix, the input and
+        the output are shared rather than pickled. If the fork start method
+        is not available, all rows are processed by the calling process.
+
+    Args:
+        t (:obj:`numpy.array`, 1-dim):
+              Temporal grid.
+        w (:obj:`numpy.array`, 1-dim):
+              Angular-frequency grid.
+        utz (:obj:`numpy.ndarray`, 2-dim, or :obj:`str`):
+              Time-domain representation of the signals, one row per
+              :math:`z`-slice, e.g. a memory-mapped array, or name of a
+              `.npy` file holding them, which is memory-mapped.
+        z_ids (:obj:`list`):
+              Indices of the rows of `utz` for which spectrograms are
+              computed (default: None, i.e. all rows).
+        t_lim, Nt, s0, dtype, max_memory, cutoff, oversample:
+              See `spectrogram`.
+        workers (:obj:`int`):
+              Number of worker processes (default: number of cores).
+        path (:obj:`str`):
+              Name of `.npy` file used as memory-mapped output, so that the
+              spectrograms are streamed to disk (default: None, i.e. keep
+              spectrograms in memory).
+
+    Returns:
+        :obj:`list`: (t_spec, w_spec, P_ztw), where `t_seq`
+        (:obj:`numpy.ndarray`, 1-dim) are delay times, `w`
+        (:obj:`numpy.ndarray`, 1-dim) are angular frequencies, and `P_ztw`
+        (:obj:`numpy.ndarray`, 3-dim) holds the spectrogram of each
+        selected row, of shape `(len(z_ids), w.size, Nt)`.
+    """
+    if isinstance(utz, str):
+        utz = np.load(utz, mmap_mode="r")
+    z_ids = range(utz.shape[0]) if z_ids is None else z_ids
+    stft = _ShortTimeFT(
+        t, w, t_lim, Nt, s0, dtype, max_memory, cutoff, oversample, cache=True
+    )
+    shape = (len(z_ids), t.size, Nt)
+    if path is not None:
+        out = np.lib.format.open_memmap(path, mode="w+", dtype=stft.rdtype, shape=shape)
+    else:
+        # -- ANONYMOUS SHARED MAPPING, WRITABLE BY FORKED WORKERS
+        nBytes = int(np.prod(shape)) * stft.rdtype.itemsize
+        out = np.frombuffer(mmap.mmap(-1, max(nBytes, 1)), dtype=stft.rdtype)
+        out = out[: int(np.prod(shape))].reshape(shape)
+    tasks = list(enumerate(z_ids))
+    if workers == 1 or "fork" not in mp.get_all_start_methods():
+        _batch_init(stft, utz, out)
+        for task in tasks:
+            _batch_worker(task)
+    else:
+        with mp.get_context("fork").Pool(
+            workers, initializer=_batch_init, initargs=(stft, utz, out)
+        ) as pool:
+            for _ in pool.imap_unordered(_batch_worker, tasks):
+                pass
+    if isinstance(out, np.memmap):
+        out.flush()
+    return stft.t_seq, SHIFT(w), out
+
+
+def _batch_init(stft, utz, out):
+    r"""Store batch configuration and a work array in worker process"""
+    global _BATCH
+    P = np.empty((stft.t_seq.size, stft.t.size), dtype=stft.rdtype)
+    _BATCH = (stft, utz, out, P)
+
+
+def _batch_worker(task):
+    r"""Compute the spectrogram of a single row
+
+    Args:
+        task (:obj:`tuple`): (k, i), where `k` is the index in the output
+            and `i` is the index of the row of `utz`.
+    """
+    k, i = task
+    stft, utz, out, P = _BATCH
+    stft(utz[i], P)
+    out[k] = P.T
+    return k
+
+
+class _ShortTimeFT:
+    r"""Short time Fourier transform employing a Gaussian window function
+
+    Holds all quantities that do not depend on the signal, so that signals
+    on the same grid are transformed with the same setup. With `cache`,
+    the windows of all delay times (the gate matrix) are computed once,
+    otherwise they are computed block by block. See `spectrogram` for the
+    arguments.
+    """
+
+    def __init__(
+        self, t, w, t_lim, Nt, s0, dtype, max_memory, cutoff, oversample, cache=False
+    ):
+        if t_lim == None:
+            t_min, t_max = np.min(t), np.max(t)
+        else:
+            t_min, t_max = t_lim
+        # -- DELAY TIMES
+        self.t_seq = np.linspace(t_min, t_max, Nt)
+        self.dtype = np.dtype(dtype)
+        self.rdtype = rdtype = self.dtype.type(0).real.dtype
+        self.t, self.s0, self.cutoff = t, s0, cutoff
+        N, dt = t.size, t[1] - t[0]
+        cbytes, rbytes = self.dtype.itemsize, rdtype.itemsize
+        # -- SUPPORT OF TRUNCATED WINDOW AND LENGTH OF THE SMALL FFT
+        L = N if cutoff is None else int(np.ceil(2 * cutoff * s0 / dt)) + 1
+        self.nFFT = nFFT = N if L >= N else 2 ** int(np.ceil(np.log2(oversample * L)))
+        self.truncated = nFFT < N
+        self.L = L
+        if self.truncated:
+            # -- LINEAR INTERPOLATION FROM SHIFTED COARSE ONTO SHIFTED FINE
+            # -- GRID, PERIODIC IN FREQUENCY. IF THE COARSE GRID IS A SUBGRID,
+            # -- EACH COARSE INTERVAL HOLDS M FINE POINTS AT THE SAME OFFSETS
+            self.M = N // nFFT
+            self.refine = N % nFFT == 0 and N % 2 == 0
+            if self.refine:
+                self.a = (np.arange(self.M) / self.M).astype(rdtype)
+            else:
+                wc = SHIFT(FTFREQ(nFFT, d=dt) * 2 * np.pi)
+                p = (SHIFT(w) - wc[0]) / (wc[1] - wc[0])
+                self.jc = np.floor(p).astype(int) % nFFT
+                self.a = (p - np.floor(p)).astype(rdtype)
+                self.jc1 = (self.jc + 1) % nFFT
+            # -- NORMALIZATION OF THE SMALL FFT RELATIVE TO FT OF LENGTH N
+            self.scale = rdtype.type((nFFT / N) ** 2)
+            perDelay = 2 * nFFT * cbytes + 3 * N * rbytes
+        else:
+            perDelay = 2 * N * cbytes
+        # -- DELAY TIMES PER BLOCK: WINDOWED SIGNALS AND THEIR SPECTRA
+        self.nBlock = max(1, int(max_memory) // perDelay)
+        self._gate = self._gates(0, Nt) if cache else None
+
+    def _h(self, t):
+        r"""Window function"""
+        s0 = self.s0
+        return (np.exp(-(t ** 2) / 2 / s0 / s0) / np.sqrt(2.0 * np.pi * s0 * s0)).astype(
+            self.rdtype
+        )
+
+    def _gates(self, j0, j1):
+        r"""Windows of the delay times `t_seq[j0:j1]`
+
+        Returns:
+            :obj:`tuple`: (g, idx), where `g` holds the window of each delay
+            time on its support and `idx` holds the indices of the support in
+            the zero-padded signal (None without truncation).
+        """
+        t, tau = self.t, self.t_seq[j0:j1, np.newaxis]
+        if not self.truncated:
+            return self._h(t - tau), None
+        N, L, dt, tc = t.size, self.L, t[1] - t[0], self.cutoff * self.s0
+        # -- FIRST SAMPLE OF EACH SUPPORT, RELATIVE TO THE PADDED SIGNAL
+        n0 = np.clip(np.round((tau - tc - t[0]) / dt), -L, N).astype(int)
+        idx = n0 + np.arange(L)
+        x = t[0] + idx * dt - tau
+        g = np.where(np.abs(x) <= tc, self._h(x), 0).astype(self.rdtype)
+        return g, idx + L
+
+    def __call__(self, ut, P, workers=1):
+        r"""Compute spectrogram of a signal
+
+        Args:
+            ut (:obj:`numpy.ndarray`, 1-dim): Time-domain representation of
+            the signal.
+            P (:obj:`numpy.ndarray`, 2-dim): Output of shape `(Nt, t.size)`,
+            i.e. one row per delay time (overwritten).
+            workers (:obj:`int`): Number of threads processing blocks of
+            delay times (default: 1).
+        """
+        N, Nt, nBlock = self.t.size, self.t_seq.size, self.nBlock
+        ut = np.asarray(ut).astype(self.dtype, copy=False)
+        if self.truncated:
+            # -- ZERO-PADDED SIGNAL, SO THAT SUPPORTS NEED NOT BE CLIPPED
+            L = self.L
+            ut_pad = np.zeros(N + 2 * L, dtype=self.dtype)
+            ut_pad[L : L + N] = ut
+            ut = ut_pad
+
+        def _block(j0):
+            j1 = min(j0 + nBlock, Nt)
+            if self._gate is None:
+                g, idx = self._gates(j0, j1)
+            else:
+                g, idx = self._gate
+                g, idx = g[j0:j1], None if idx is None else idx[j0:j1]
+            if self.truncated:
+                self._truncatedBlock(g * ut[idx], P[j0:j1])
+                return
+            # -- COMPUTE TIME-FREQUENCY RESOLVED CONTENT OF INPUT FIELD
+            S = FT(g * ut[np.newaxis, :], axis=-1)
+            # -- STORE |S|^2 IN SHIFTED FREQUENCY ORDER, SEE SHIFT
+            Pb, m = P[j0:j1], N - N // 2
+            np.abs(S[:, N // 2 :], out=Pb[:, :m])
+            np.abs(S[:, : N // 2], out=Pb[:, m:])
+            np.square(Pb, out=Pb)
+
+        blocks = range(0, Nt, nBlock)
+        if workers > 1 and len(blocks) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(_block, blocks))
+        else:
+            for j0 in blocks:
+                _block(j0)
+
+    def _truncatedBlock(self, y, Pb):
+        r"""Spectrogram of windowed signals on the support of their window
+
+        Args:
+            y (:obj:`numpy.ndarray`, 2-dim): Windowed signals on their support,
+            one row per delay time.
+            Pb (:obj:`numpy.ndarray`, 2-dim): Output rows (overwritten).
+        """
+        nRows, nFFT = y.shape[0], self.nFFT
+        Y = np.zeros((nRows, nFFT), dtype=self.dtype)
+        Y[:, : self.L] = y
+        Pc = np.abs(SHIFT(FT(Y, axis=-1), axes=-1)) ** 2
+        Pc *= self.scale
+        if not self.refine:
+            np.multiply(Pc[:, self.jc], 1 - self.a, out=Pb)
+            Pb += Pc[:, self.jc1] * self.a
+            return
+        D = np.roll(Pc, -1, axis=1)
+        D -= Pc
+        tgt = Pb if Pb.flags.c_contiguous else np.empty(Pb.shape, dtype=self.rdtype)
+        P3 = tgt.reshape(nRows, nFFT, self.M)
+        np.multiply(D[:, :, np.newaxis], self.a, out=P3)
+        P3 += Pc[:, :, np.newaxis]
+        if tgt is not Pb:
+            Pb[...] = tgt
 
 
 def plot_spectrogram(z_pos, t_delay, w_opt, P_tw, t_lim = None, w_lim = None, o_name = None):
@@ -59,6 +373,27 @@ def plot_spectrogram(z_pos, t_delay, w_opt, P_tw, t_lim = None, w_lim = None, o_
         w_opt (:obj:`numpy.ndarray`, 1-dim): Angular-frequency grid.
         P_tw (:obj:`numpy.ndarray`, 2-dim): Spectrogram data.
     """
+    f = plt.figure(figsize=(4, 3))
+    _draw_spectrogram(f, z_pos, t_delay, w_opt, P_tw, t_lim, w_lim)
+
+    if o_name:
+        plt.savefig(o_name + ".png", format="png", dpi=600)
+        plt.close()
+    else:
+        plt.show()
+
+
+def _draw_spectrogram(f, z_pos, t_delay, w_opt, P_tw, t_lim=None, w_lim=None):
+    r"""Draw the spectrogram figure of `plot_spectrogram` into a figure
+
+    Args:
+        f (:obj:`matplotlib.figure.Figure`): Empty figure of size (4, 3).
+        z_pos, t_delay, w_opt, P_tw, t_lim, w_lim: See `plot_spectrogram`.
+
+    Returns:
+        :obj:`tuple`: (im, text), the image and the label showing
+        :math:`z`, which can be updated for subsequent frames.
+    """
     if t_lim == None:
         t_min, t_max = t_delay[0], t_delay[-1]
     else:
@@ -70,9 +405,9 @@ def plot_spectrogram(z_pos, t_delay, w_opt, P_tw, t_lim = None, w_lim = None, o_
         w_min, w_max = w_lim
 
 
-    f, ax1 = plt.subplots(1, 1, sharey=True, figsize=(4, 3))
-    plt.subplots_adjust(left=0.15, right=0.95, bottom=0.15, top=0.78)
-    cmap = mpl.cm.get_cmap("jet")
+    ax1 = f.subplots(1, 1, sharey=True)
+    f.subplots_adjust(left=0.15, right=0.95, bottom=0.15, top=0.78)
+    cmap = plt.get_cmap("jet")
 
     def _setColorbar(im, refPos):
         """colorbar helper"""
@@ -94,9 +429,7 @@ def plot_spectrogram(z_pos, t_delay, w_opt, P_tw, t_lim = None, w_lim = None, o_
         cbar.ax.tick_params(which="minor", bottom=False, top=False)
         return cbar
 
-    _truncate = lambda I: np.where(I>I.max()*1e-5, I ,  I.max()*1e-5)
-
-    I = _truncate(P_tw[:-1, :-1] / P_tw.max())
+    I = _normalize_spectrogram(P_tw)
     im1 = ax1.pcolorfast(
         t_delay,
         w_opt,
@@ -114,13 +447,15 @@ def plot_spectrogram(z_pos, t_delay, w_opt, P_tw, t_lim = None, w_lim = None, o_
     ax1.set_xlabel(r"Delay time $t$")
     ax1.set_ylabel(r"Angular frequency $\omega$")
 
-    ax1.text(0., 0., r'$z = %3.2lf$'%(z_pos), horizontalalignment='left', color='white',
+    text = ax1.text(0., 0., r'$z = %3.2lf$'%(z_pos), horizontalalignment='left', color='white',
                             verticalalignment='bottom', transform=ax1.transAxes)
+    return im1, text
 
-    if o_name:
-        plt.savefig(o_name + ".png", format="png", dpi=600)
-        plt.close()
-    else:
-        plt.show()
+
+def _normalize_spectrogram(P_tw):
+    r"""Spectrogram data as shown by `plot_spectrogram`, i.e. normalized to
+    unit maximum and truncated below :math:`10^{-5}`"""
+    _truncate = lambda I: np.where(I>I.max()*1e-5, I ,  I.max()*1e-5)
+    return _truncate(P_tw[:-1, :-1] / P_tw.max())
 
 
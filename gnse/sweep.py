@@ -0,0 +1,162 @@
+"""
+Implements a runner for parameter sweeps that distributes independent
+simulation runs over a pool of worker processes.
+
+Results are passed back to the parent process through shared memory, so that
+large arrays such as the stored field are not pickled. Each worker writes the
+requested quantities of a run to shared memory segments and returns only
+their names, shapes and dtypes. The parent copies them into result arrays
+and releases the segments.
+
+Note:
+    On Linux, worker processes are forked, so that the initial-condition
+    factory and quantity functions may be lambdas or closures. With other
+    start methods they need to be picklable, i.e. defined at module level.
+"""
+import inspect
+import itertools
+import multiprocessing as mp
+from multiprocessing import shared_memory, resource_tracker
+import numpy as np
+
+# -- SWEEP CONFIGURATION, SET IN EACH WORKER PROCESS BY _sweep_init
+_SWEEP = None
+
+
+def _sweep_init(solverClass, solverArgs, initial, quantities):
+    r"""Store sweep configuration in worker process"""
+    global _SWEEP
+    names = set(inspect.signature(solverClass).parameters)
+    _SWEEP = (solverClass, solverArgs, names, initial, quantities)
+
+
+def _sweep_worker(task):
+    r"""Perform a single run of the sweep
+
+    Args:
+        task (:obj:`tuple`): (idx, params), where `idx` is the index of the
+            run and `params` is a dictionary holding the parameters.
+
+    Returns:
+        :obj:`tuple`: (idx, out), where `out` maps the name of each quantity
+        to the name, shape and dtype of the shared memory segment holding it.
+    """
+    idx, params = task
+    solverClass, solverArgs, names, initial, quantities = _SWEEP
+    args = dict(solverArgs)
+    args.update({k: v for k, v in params.items() if k in names})
+    solver = solverClass(**args)
+    solver.solve(initial(solver.t, params))
+    out = {}
+    for name, q in quantities.items():
+        res = np.asarray(getattr(solver, q) if isinstance(q, str) else q(solver))
+        shm = shared_memory.SharedMemory(create=True, size=max(res.nbytes, 1))
+        np.ndarray(res.shape, dtype=res.dtype, buffer=shm.buf)[...] = res
+        out[name] = (shm.name, res.shape, res.dtype.str)
+        shm.close()
+    return idx, out
+
+
+def sweep(
+    solverClass,
+    solverArgs,
+    grid,
+    initial,
+    quantities=("z", "uwz"),
+    nWorkers=None,
+):
+    r"""Perform a parameter sweep using a pool of worker processes.
+
+    Runs one simulation for each point of the cartesian product of the
+    parameter values in `grid`. Parameters named like an argument of the
+    solver constructor override the respective entry of `solverArgs`. All
+    parameters are passed on to the initial-condition factory.
+
+    Example:
+        Sweep over the frequency of the dispersive wave in the event
+        horizon setup, keeping only the final spectrum::
+
+            params, res = sweep(
+                Symmetric_Split_Step_Solver,
+                dict(z=z, t=t, beta=beta(w), gamma=gamma, nSkip=nSkip),
+                {"w1": [16.0, 18.0, 20.0], "t_sep": [20.0, 30.0]},
+                lambda t, p: u_S(t) + u_DW(t, p["w1"], p["t_sep"]),
+                quantities={"uw": lambda s: s.uwz[-1]},
+            )
+
+    Args:
+        solverClass (:obj:`type`):
+            Solver class derived from `SolverBaseClass`.
+        solverArgs (:obj:`dict`):
+            Keyword arguments for the solver constructor.
+        grid (:obj:`dict`):
+            Parameter grid, mapping parameter names to lists of values.
+        initial (:obj:`callable`):
+            Initial-condition factory, called as `initial(t, params)` with
+            the temporal grid `t` and a dictionary `params` holding the
+            parameters of the run. Returns the time-domain representation of
+            the initial field.
+        quantities (:obj:`tuple` or :obj:`dict`):
+            Quantities returned by each run. Either names of solver
+            attributes (default: ("z", "uwz")), or a dictionary mapping names
+            to attribute names or to callables that take the solver after the
+            run and return an array.
+        nWorkers (:obj:`int`):
+            Number of worker processes (default: number of cores).
+
+    Returns:
+        :obj:`tuple`: (params, results), where `params` is the list of
+        parameter dictionaries in order of the runs and `results` maps the
+        name of each quantity to an array with one row per run. If the
+        shape of a quantity differs between runs, a list of arrays is
+        returned instead.
+    """
+    if not isinstance(quantities, dict):
+        quantities = {q: q for q in quantities}
+    params = [dict(zip(grid, vals)) for vals in itertools.product(*grid.values())]
+    nRuns = len(params)
+    if "fork" in mp.get_all_start_methods():
+        ctx = mp.get_context("fork")
+    else:
+        ctx = mp.get_context()
+    # -- SHARE RESOURCE TRACKER WITH WORKERS, SO THAT SEGMENTS RELEASED BY
+    # -- THE PARENT ARE NOT REPORTED AS LEAKED BY THE WORKERS
+    resource_tracker.ensure_running()
+
+    results, filled = {}, {}
+    with ctx.Pool(
+        nWorkers,
+        initializer=_sweep_init,
+        initargs=(solverClass, solverArgs, initial, quantities),
+    ) as pool:
+        for idx, out in pool.imap_unordered(_sweep_worker, enumerate(params)):
+            for name, (shmName, shape, dtype) in out.items():
+                shm = shared_memory.SharedMemory(name=shmName)
+                try:
+                    res = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+                    _collect(results, filled, name, idx, res, nRuns)
+                finally:
+                    shm.close()
+                    shm.unlink()
+    return params, results
+
+
+def _collect(results, filled, name, idx, res, nRuns):
+    r"""Copy result of a single run into the result arrays
+
+    Results of equal shape are gathered in one array with a row per run.
+    Upon the first mismatch in shape, the array is converted to a list.
+    """
+    arr = results.get(name)
+    if arr is None:
+        arr = results[name] = np.empty((nRuns,) + res.shape, dtype=res.dtype)
+        filled[name] = set()
+    if isinstance(arr, np.ndarray):
+        if arr.shape[1:] == res.shape:
+            arr[idx] = res
+            filled[name].add(idx)
+            return
+        arr = results[name] = [
+            arr[i] if i in filled[name] else None for i in range(nRuns)
+        ]
+    arr[idx] = np.array(res)
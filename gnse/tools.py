@@ -49,7 +49,7 @@ def plot_details_prop_const(w, beta1, beta2, oName=None):
         plt.show()
 
 
-def plot_evolution(z, t, u, tLim=None, wLim=None, oName=None):
+def plot_evolution(z, t, u, tLim=None, wLim=None, oName=None, wShift=0.0):
     def _setColorbar(im, refPos):
         x0, y0, w, h = refPos.x0, refPos.y0, refPos.width, refPos.height
         cax = f.add_axes([x0, y0 + 1.02 * h, w, 0.02 * h])
@@ -73,7 +73,8 @@ def plot_evolution(z, t, u, tLim=None, wLim=None, oName=None):
         I[I < 1e-6] = 1e-6
         return I
 
-    w = SHIFT(FTFREQ(t.size, d=t[1] - t[0]) * 2 * np.pi)
+    # -- ANGULAR FREQUENCIES OF A FIELD DEMODULATED BY wShift, SEE solver.tRec
+    w = SHIFT(FTFREQ(t.size, d=t[1] - t[0]) * 2 * np.pi) + wShift
 
     if tLim == None:
         tLim = (np.min(t), np.max(t))
@@ -122,7 +123,7 @@ def plot_evolution(z, t, u, tLim=None, wLim=None, oName=None):
         
        
     
-def figure_1b(res,oName=None):
+def figure_1b(res, oName=None, labels=None):
     """Plot RMS error of splitting schemes
 
     Generates a loglog-plot showing the scaling behavior of the
@@ -131,16 +132,22 @@ def figure_1b(res,oName=None):
     picture method.
 
     Args:
-        res (array): results of the simulation run in Quality_control.py
+        res (array): results of the simulation run in Quality_control.py,
+            each row holding the stepsize followed by the RMS errors of the
+            considered methods
         oName (str): name of output figure (optional, default: None)
+        labels (list): names of the considered methods (optional, default:
+            simple splitting, symmetric splitting, interaction picture method)
     """
 
-    dz, RMSError_1, RMSError_2, RMSError_3 = zip(*res)
+    dz, *RMSErrors = zip(*res)
+    if labels is None:
+        labels = [r"simple splitting", r"symmetric splitting", r"Interaction picture method"]
+    markers = [r"o-", r"^-", r"s-", r"v-", r"D-", r"<-", r">-", r"p-"]
 
     f, ax = plt.subplots()
-    ax.plot(dz, RMSError_1, r"o-", label=r"simple splitting")
-    ax.plot(dz, RMSError_2, r"^-", label=r"symmetric splitting")
-    ax.plot(dz, RMSError_3, r"^-", label=r"Interaction picture method")
+    for i, (RMSError, label) in enumerate(zip(RMSErrors, labels)):
+        ax.plot(dz, RMSError, markers[i % len(markers)], label=label)
     ax.set(xlabel=r"stepsize $dz$",ylabel=r"RMS error")
     ax.set_xscale("log")
     ax.set_yscale("log")
@@ -151,4 +158,3 @@ def figure_1b(res,oName=None):
         plt.savefig(oName,format='png',dpi=600)
     else:
         plt.show()
-    
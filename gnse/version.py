@@ -2,11 +2,70 @@
 Clarifies versioning for the project.
 
 """
-__version__ = "0.1.3"
+__version__ = "0.2.0"
 
 """
 CHANGELOG:
 
+0.2.0 (unreleased)
+------------------
+* solver.py - linear propagators are precomputed upon construction and
+  singleStep advances the field in place using preallocated work arrays
+* solver.py - fixed undefined linear step in Symmetric_Split_Step_Solver
+* config.py - FT/IFT dispatch to a selectable FFT backend (numpy, scipy,
+  pyfftw), see set_fft_backend and the GNSE_FFT_* environment variables
+* solver.py - batched propagation of initial conditions of shape
+  (n_runs, Nt) in lockstep, with beta and gamma broadcast per member
+* solver.py - adaptive stepsize control by step doubling (tol, maxRefine),
+  with propagators cached per stepsize
+* solver.py - propagate: generator yielding the field every nSkip steps
+  without storing it; callback and store arguments of solve
+* solver.py - stored states preallocated in a single array, or in a
+  memory-mapped .npy file (path argument of solve)
+* solver.py - utz cached between runs; utzView (TimeDomainView) and
+  utAt, uwAt, nearestIndex transform only the requested states
+* solver.py - disk checkpoints (checkpoint, nCheckpoint, tCheckpoint) and
+  restart of interrupted runs, see the arguments of solve
+* sweep.py - new module: parameter sweeps over a pool of worker
+  processes, returning results in shared memory
+* numExp08_benchmarks - benchmark suite for throughput and peak memory of
+  solvers, spectrogram and propagation constant, with --compare
+* profiler.py - new module: SolverProfiler timing the phases of a step,
+  snapshot storage and progress, see the profiler argument of solve
+* solver.py - composition split-step solvers of 4th and 6th order
+  (Yoshida, Suzuki, Blanes-Moan) with fused linear substeps
+* solver.py - Interaction_picture_method follows Hult's midpoint
+  formulation, requiring only the linear half step propagator
+* solver.py - fixed stepsize driver advances the field between stored
+  states via multiStep; Symmetric_Split_Step_Solver merges adjacent
+  linear half steps into full steps
+* kernels.py - new module: fused nonlinear step evaluated by numba or
+  numexpr if installed, numpy otherwise, see set_kernel_backend and
+  GNSE_KERNEL_* environment variables
+* solver.py, spectrogram.py - dtype option for single precision
+  (complex64) propagation and spectrograms
+* diagnostics.py - new module: energy, photon number, Hamiltonian, band
+  energies and RMS width/centroid recorded during propagation, see the
+  diagnostics argument of solve
+* solver.py - delayed Raman response (fR, hR, raman_response) and
+  self-steepening (w0) in all solvers
+* config.py - real-input transforms RFFT and IRFFT
+* solver.py - propagation in a moving frame of reference (v0, wRef),
+  see also group_velocity
+* solver.py, diagnostics.py - absorbing boundaries and spectral filters
+  (alphaT, alphaW, absorbing_layer) and the absorbed energy as diagnostic
+* solver.py - stored states restricted to a time window, frequency window
+  or grid resampled after shifting wLim to baseband (tLim, wLim, nT), see
+  tRec, wRec and wShift
+* spectrogram.py - delay times processed in blocks bounded by max_memory,
+  optionally by several threads, writing into a preallocated output (out)
+* spectrogram.py - truncated window support (cutoff, oversample),
+  transforming only the support of the window by a short FFT
+* spectrogram.py - batch_spectrogram: spectrograms of many z-slices by a
+  pool of worker processes, sharing one gate matrix, optionally on disk
+* animation.py - new module: parallel rendering of spectrogram frames
+  reusing one figure per worker, written to disk or piped to an encoder
+
 0.1,3 (Fr 18 Jun 2021 14:51:04 CEST)
 ------------------------------------
 * Added module spectrogram.py -- OM
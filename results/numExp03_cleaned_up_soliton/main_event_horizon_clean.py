@@ -56,8 +56,7 @@ def main():
 
     # -- CLEAN UP THE SOLITON: GET RID OF BACKROUND RADIATION
     # ... CONSIDER THE SOLITON + EXCESS RADIATION AT z=20
-    z_id = np.argmin(np.abs(my_solver.z-20))
-    ut_s = np.copy(my_solver.utz[z_id])
+    ut_s = my_solver.utAt(20)
     It_s = np.abs(ut_s)**2
     # ... FIND WHERE THE PEAK OF THE SOLITON IS SO WE CAN SHIFT IT BACK TO t=0
     t_max = t[np.argmax(It_s)]
@@ -69,8 +68,7 @@ def main():
     # ... SET UP THE NEW INITIAL CONDITION CONSISTING OF SOLITON + DW
     A0_t = ut_s  + u_DW(t)
     # ... CLEAN UP THE INTERNAL WORKING ARRAYS OF THE SOLVER
-    my_solver._z = []
-    my_solver._u = []
+    my_solver.reset()
     # ... PERFORM A NEW SIMULATION RUN WITH A CLEANED UP INITIAL CONDITION
     my_solver.solve(A0_t)
 
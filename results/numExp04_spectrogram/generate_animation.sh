@@ -6,3 +6,6 @@ python3 main_spectrogram.py
 # ... FOR THIS TO WORK YOU NEED TO HAVE INSTALLED IMAGEMAGICK LIBRARY 
 convert ./figs/* spec.gif
 
+# -- ALTERNATIVELY, ENCODE THE FRAMES DIRECTLY AS MOVIE BY PASSING
+# -- movie='spec.mp4' INSTEAD OF o_name TO render_spectrograms IN
+# -- main_spectrogram.py (REQUIRES FFMPEG)
@@ -1,6 +1,8 @@
 import sys; sys.path.append('../../')
 import numpy as np
-from gnse.spectrogram import spectrogram, plot_spectrogram
+from gnse.config import FT, FTFREQ, SHIFT
+from gnse.spectrogram import spectrogram, batch_spectrogram, plot_spectrogram
+from gnse.animation import render_spectrograms
 
 def fetch_data(f_name):
     dat = np.load(f_name)
@@ -20,7 +22,7 @@ def main():
     # -- Z-POSITION AT WHICH TO COMPUTE SPECTROGRAM
     z_id = np.argmin(np.abs(z-16.))
 
-    t_S, w_S, P_tw = spectrogram(t, w, utz[z_id], Nt=1000 , s0=1.)
+    t_S, w_S, P_tw = spectrogram(t, w, utz[z_id], Nt=1000 , s0=1., cutoff=6.)
     plot_spectrogram(z[z_id], t_S, w_S, P_tw, t_lim = t_lim, w_lim = w_lim)
 
 
@@ -33,17 +35,31 @@ def main2():
     t_lim = (-40,60)
     w_lim = (-15,35)
 
+    # -- COMPUTE SPECTROGRAMS OF EVERY 6TH Z-SLICE IN ONE BATCH, STREAMED
+    # -- TO DISK SINCE EACH SPECTROGRAM TAKES Nt*1000 FLOATS
+    z_ids = range(0, z.size, 6)
+    t_S, w_S, P_ztw = batch_spectrogram(
+        t, w, utz, z_ids, Nt=1000, s0=1.0, cutoff=6., path='P_ztw.npy'
+    )
 
-    for idx, i in enumerate(range(10,20,1)):
-            print(idx, i)
+    # -- RENDER FRAMES IN PARALLEL, REUSING ONE FIGURE PER WORKER
+    render_spectrograms(z[z_ids], t_S, w_S, P_ztw, t_lim = t_lim, w_lim = w_lim, o_name = './figs/fig_%03d')
 
-    exit()
 
-    for fig_id, ut in enumerate(utz[::6]):
-        t_S, w_S, P_tw = spectrogram(t, w, ut, Nt=1000 , s0=1.0)
-        plot_spectrogram(z[fig_id], t_S, w_S, P_tw, t_lim = t_lim, w_lim = w_lim, o_name = './figs/fig_%03d'%(fig_id))
+def check_grid(Nt=4097):
+    # -- COMPARE BLOCKWISE SPECTROGRAM TO THE DIRECT FORMULA ON A GRID OF
+    # -- Nt SAMPLES, E.G. AN ODD NUMBER, WHERE SHIFT DIFFERS FROM ITS INVERSE
+    t = np.linspace(-100, 100, Nt, endpoint=False)
+    w = FTFREQ(t.size, d=t[1] - t[0]) * 2 * np.pi
+    ut = np.exp(-t ** 2 / 8 - 1j * t * (3 + 0.05 * t))
+    h = lambda t: np.exp(-(t ** 2) / 2) / np.sqrt(2.0 * np.pi)
+    t_S, w_S, P_tw = spectrogram(t, w, ut, Nt=200, s0=1., max_memory=2 ** 20)
+    P = np.abs(FT(h(t - t_S[:, np.newaxis]) * ut[np.newaxis, :], axis=-1)) ** 2
+    err = np.max(np.abs(P_tw - np.swapaxes(SHIFT(P, axes=-1), 0, 1))) / P.max()
+    print("# Nt = %d: max. relative deviation %e" % (Nt, err))
 
 
 if __name__ == '__main__':
     #main()
+    #check_grid()
     main2()
@@ -1,16 +1,13 @@
 import sys; sys.path.append('../../')
 import numpy as np
 from gnse.solver import Symmetric_Split_Step_Solver
+from gnse.diagnostics import Diagnostics
 from gnse.tools import plot_evolution
 from gnse.config import FTFREQ, FT, IFT
 from gnse.propagation_constant import prop_const
 from gnse.tools import plot_details_prop_const
 
 
-def energy(Iw):
-    return np.sum(Iw,axis=-1)
-
-
 def main():
     # -- SET PARAMETERS FOR COMPUTATIONAL DOMAIN
     tMax = 200.0  # (fs) bound for time mesh
@@ -60,8 +57,7 @@ def main():
 
     # -- CLEAN UP THE SOLITON: GET RID OF BACKROUND RADIATION
     # ... CONSIDER THE SOLITON + EXCESS RADIATION AT z=20
-    z_id = np.argmin(np.abs(my_solver.z-20))
-    ut_s = np.copy(my_solver.utz[z_id])
+    ut_s = my_solver.utAt(20)
     It_s = np.abs(ut_s)**2
     # ... FIND WHERE THE PEAK OF THE SOLITON IS SO WE CAN SHIFT IT BACK TO t=0
     t_max = t[np.argmax(It_s)]
@@ -73,10 +69,12 @@ def main():
     # ... SET UP THE NEW INITIAL CONDITION CONSISTING OF SOLITON + DW
     A0_t = ut_s  + u_DW(t)
     # ... CLEAN UP THE INTERNAL WORKING ARRAYS OF THE SOLVER
-    my_solver._z = []
-    my_solver._u = []
-    # ... PERFORM A NEW SIMULATION RUN WITH A CLEANED UP INITIAL CONDITION
-    my_solver.solve(A0_t)
+    my_solver.reset()
+    # ... PERFORM A NEW SIMULATION RUN WITH A CLEANED UP INITIAL CONDITION,
+    # ... RECORDING THE TOTAL ENERGY AND THE ENERGIES OF THE SOLITON (w<10)
+    # ... AND DISPERSIVE WAVE (w>10) ON THE FLY
+    diag = Diagnostics(bands={"a": (-np.inf, 10.), "n": (10., np.inf)}, every=nSkip)
+    my_solver.solve(A0_t, diagnostics=diag)
 
     #It = np.abs(ut_s)**2
     #for i in range(t.size):
@@ -93,15 +91,11 @@ def main():
     #np.savez_compressed('res_S_DW_collision', **results)
 
 
-    # -- COMPUTE THE PULSE ENERGIES
-    z = my_solver.z
-    w = my_solver.w
-    uwz = my_solver.uwz
-    Iw = np.abs(uwz)**2
-
-    e_full = energy(Iw)
-    e_a    = energy(Iw[:, w<10.])
-    e_n    = energy(Iw[:, w>10.])
+    # -- PULSE ENERGIES
+    z = diag.z
+    e_full = diag["energy"]
+    e_a    = diag["a"]
+    e_n    = diag["n"]
 
     for i in range(z.size):
         print(z[i], e_full[i], e_a[i], e_n[i])
@@ -2,7 +2,7 @@ import sys; sys.path.append('../../')
 import numpy as np
 from gnse.solver import Symmetric_Split_Step_Solver
 from gnse.tools import plot_evolution
-from gnse.config import FTFREQ, FT, IFT
+from gnse.config import FTFREQ
 from gnse.propagation_constant import prop_const
 from gnse.tools import plot_details_prop_const
 
@@ -41,22 +41,25 @@ def main():
     w = FTFREQ(t.size, d=t[1] - t[0]) * 2 * np.pi
     z = np.linspace(0, 5*LD(w1,t1), Nz + 1)
 
-    # -- INITIALIZE SOLVER
-    my_solver = Symmetric_Split_Step_Solver(z, t, beta(w), gamma, nSkip=nSkip)
+    # -- INITIALIZE SOLVER IN FRAME OF REFERENCE IN WHICH INITIAL PULSE IS
+    # -- STATIONARY, I.E. MOVING WITH REFERENCE VELOCITY v0. STORE ONLY THE
+    # -- REGION OF INTEREST, SHIFTED TO BASEBAND BY wShift AND RESAMPLED TO
+    # -- THE COARSEST GRID RESOLVING wLim
+    v0 = 1./beta1(w1)
+    tLim, wLim = (-100, 400), (-10, 30)
+    my_solver = Symmetric_Split_Step_Solver(
+        z, t, beta(w), gamma, nSkip=nSkip, v0=v0, tLim=tLim, wLim=wLim
+    )
 
     # -- SET INITIAL CONDITION AND RUN
     A0_t = u_DW(t)
     my_solver.solve(A0_t)
 
-    # -- TRANSFORM TO FRAME OF REFERENCE IN WHICH INITIAL PULSE IS STATIONARY 
     z = my_solver.z
-    t = my_solver.t
-    w = my_solver.w
-    uwz = my_solver.uwz
-    # ... REFERENCE VELOCITY
-    v0 = 1./beta1(w1)
-    # ... PERFORM SHIFT TO REFERENCE FRAME MOVING WITH VELOCITY v0
-    utz = IFT(np.exp(-1j*w*z[:,np.newaxis]/v0)*uwz)
+    t = my_solver.tRec
+    w = my_solver.wRec
+    utz = my_solver.utz
+    wShift = my_solver.wShift
 
     # -- SAVE DATA
     results = {
@@ -64,12 +67,13 @@ def main():
         "w": w,
         "z": z,
         "utz": utz,
+        "wShift": wShift,
     }
     np.savez_compressed('res_SC_generation', **results)
 
     # -- SHOW RESULTS
     plot_evolution(
-        z, t, utz, tLim=(-100, 400), wLim=(-10, 30), oName='fig_SC_generation'
+        z, t, utz, tLim=tLim, wLim=wLim, oName='fig_SC_generation', wShift=wShift
     )
 
 
@@ -1,6 +1,8 @@
 import sys; sys.path.append('../../')
 import numpy as np
 from gnse.solver import Interaction_picture_method, SimpleSplitStepSolver, Symmetric_Split_Step_Solver
+from gnse.solver import Yoshida4SplitStepSolver, Suzuki4SplitStepSolver, Yoshida6SplitStepSolver, BlanesMoan4SplitStepSolver
+from gnse.sweep import sweep
 from gnse.tools import figure_1b
 from gnse.config import FTFREQ
 from gnse.propagation_constant import prop_const
@@ -46,45 +48,56 @@ def main():
     _RMSError = lambda x,y: np.sqrt(np.sum(np.abs(x-y)**2)/x.size)
     
     
-    # -- RUN SIMULATION
-    res = []
-    for Nz in [2**n for n in range(7,14)]:
-        print("# Nz = %d"%(Nz))
-        _z = np.linspace(0, zMax, Nz, endpoint=True)
-        
-        
-        # -- simple splitting scheme
-        my_solver_1 = SimpleSplitStepSolver(_z, t, beta(w), gamma, nSkip=nSkip)        
-        A0_t_1 = u_S(t)   # -- SET INITIAL CONDITION
-        my_solver_1.solve(A0_t_1)
-        Azt_1 = my_solver_1.utz
-        
-        # -- symmetric splitting scheme
-        my_solver_2 = Symmetric_Split_Step_Solver(_z, t, beta(w), gamma, nSkip=nSkip)
-        A0_t_2 = u_S(t)   # -- SET INITIAL CONDITION
-        my_solver_2.solve(A0_t_2)
-        Azt_2 = my_solver_2.utz  
-        
-        # -- interaction picture method        
-        my_solver_3 = Interaction_picture_method(_z, t, beta(w), gamma, nSkip=nSkip)
-        A0_t_3 = u_S(t)   # -- SET INITIAL CONDITION
-        my_solver_3.solve(A0_t_3)
-        Azt_3 = my_solver_3.utz
-        z = my_solver_3.z
-        
-        AExact = _AExact(z[-1],t)
+    # -- RUN SIMULATION: ALL STEPSIZES OF A SOLVER ARE RUN IN PARALLEL
+    Nz_list = [2**n for n in range(7,14)]
+    grid = {"z": [np.linspace(0, zMax, Nz, endpoint=True) for Nz in Nz_list]}
+    solver_args = dict(z=None, t=t, beta=beta(w), gamma=gamma, nSkip=nSkip)
+    quantities = {
+        "z": lambda s: s.z[-1],          # last stored z-position
+        "ut": lambda s: s.utzView[-1],   # field at last stored z-position
+    }
+    solvers = [
+        SimpleSplitStepSolver,
+        Symmetric_Split_Step_Solver,
+        Interaction_picture_method,
+        Yoshida4SplitStepSolver,
+        Suzuki4SplitStepSolver,
+        Yoshida6SplitStepSolver,
+        BlanesMoan4SplitStepSolver,
+    ]
+    err = []
+    for solver in solvers:
+        print("# %s"%(solver.__name__))
+        params, out = sweep(solver, solver_args, grid, lambda t, p: u_S(t), quantities)
+        err.append([_RMSError(_AExact(z, t), ut) for z, ut in zip(out["z"], out["ut"])])
+        # ... COST IN TERMS OF FFTS FOR THE FULL PROPAGATION DISTANCE
+        nFFT = solver(**dict(solver_args, z=grid["z"][0])).nFFT
+        for Nz, e in zip(Nz_list, err[-1]):
+            print("%8d %8d %e"%(Nz, nFFT*(Nz-1), e))
+
+    # -- ACCUMULATE SIMULATION RESULTS
+    res = [(p["z"][1]-p["z"][0], *e) for p, *e in zip(params, *err)]
 
-        # -- ACCUMULATE SIMULATION RESULTS
-        res.append(( _z[1]-_z[0],              # z-stepsize
-               _RMSError(AExact, Azt_1[-1]),  # RMSE - simple splitting scheme
-               _RMSError(AExact, Azt_2[-1]),  # RMSE - symmetric splitting scheme
-               _RMSError(AExact, Azt_3[-1])   # RMSE - interaction picture method 
-              ))
-              
-        
-        
     # -- POSTPROCESS RESULTS
-    figure_1b(res, 'Quality_control.png')
+    figure_1b(res, 'Quality_control.png', labels=[solver.__name__ for solver in solvers])
+
+    # -- SINGLE VS DOUBLE PRECISION: RMS ERROR RELATIVE TO THE PEAK AMPLITUDE.
+    # -- IN SINGLE PRECISION (complex64), ROUND-OFF ACCUMULATES OVER THE STEPS
+    # -- AND THE ERROR GROWS ROUGHLY IN PROPORTION TO THE NUMBER OF SUBSTEPS:
+    # -- ABOUT 1e-5 FOR 128 STEPS AND 1e-4 TO 1e-3 FOR 8192 STEPS. THE SIMPLE
+    # -- AND SYMMETRIC SPLIT STEP METHODS MATCH DOUBLE PRECISION DOWN TO
+    # -- ERRORS OF ABOUT 1e-4, THE HIGHER ORDER METHODS ARE LIMITED BY
+    # -- ROUND-OFF AT ALL STEPSIZES CONSIDERED HERE. SINGLE PRECISION IS THUS
+    # -- SUITED FOR EXPLORATORY RUNS WITH MODERATE NUMBERS OF STEPS.
+    print("# relative RMS error: complex128 / complex64")
+    for solver in solvers:
+        print("# %s"%(solver.__name__))
+        errs = []
+        for dtype in (np.complex128, np.complex64):
+            params, out = sweep(solver, dict(solver_args, dtype=dtype), grid, lambda t, p: u_S(t), quantities)
+            errs.append([_RMSError(_AExact(z, t), ut)/np.sqrt(P0) for z, ut in zip(out["z"], out["ut"])])
+        for Nz, e64, e32 in zip(Nz_list, *errs):
+            print("%8d %e %e"%(Nz, e64, e32))
 
 
 if __name__ == "__main__":
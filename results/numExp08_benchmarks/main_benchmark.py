@@ -0,0 +1,195 @@
+import sys; sys.path.append('../../')
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+import numpy as np
+from gnse.solver import SimpleSplitStepSolver, Symmetric_Split_Step_Solver, Interaction_picture_method
+from gnse.spectrogram import spectrogram
+from gnse.config import FTFREQ, set_fft_backend, get_fft_backend
+from gnse.kernels import set_kernel_backend, get_kernel_backend
+from gnse.propagation_constant import prop_const
+from gnse.version import __version__
+
+SOLVERS = [SimpleSplitStepSolver, Symmetric_Split_Step_Solver, Interaction_picture_method]
+
+
+def measure(fun, nRep=5):
+    """Time a function and record its peak memory.
+
+    Args:
+        fun (:obj:`callable`): Function without arguments.
+        nRep (:obj:`int`): Number of timed repetitions (default: 5).
+
+    Returns:
+        :obj:`dict`: Minimal and median wall-clock time in seconds, and peak
+        memory in bytes allocated during a single call (as traced by
+        tracemalloc, which includes numpy arrays). If the function fails,
+        the error message is recorded instead.
+    """
+    # -- WARM UP: FFT PLANS, PROPAGATOR CACHES, ETC.
+    try:
+        fun()
+    except Exception as err:
+        return {"error": repr(err)}
+    times = []
+    for _ in range(nRep):
+        t0 = time.perf_counter()
+        fun()
+        times.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    fun()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"t_min": min(times), "t_median": float(np.median(times)), "peak_bytes": peak}
+
+
+def setup(Nt, Nz, solver, nSkip=1):
+    """Fundamental soliton of the standard NSE on a grid with Nt samples"""
+    t = np.linspace(-40.0, 40.0, Nt, endpoint=False)
+    w = FTFREQ(t.size, d=t[1] - t[0]) * 2 * np.pi
+    z = np.linspace(0, 1.0, Nz + 1)
+    return solver(z, t, -0.5 * w * w, 1.0, nSkip=nSkip), 1.0 / np.cosh(t)
+
+
+def bench_singleStep(Nt, nSteps=20):
+    res = []
+    for solver in SOLVERS:
+        my_solver, u0 = setup(Nt, 1, solver)
+        _, uw = next(my_solver.propagate(u0))
+
+        def _steps():
+            for _ in range(nSteps):
+                my_solver.singleStep(uw)
+
+        r = measure(_steps)
+        if "t_min" in r:
+            r["t_step"] = r["t_min"] / nSteps
+        res.append(("singleStep", {"solver": solver.__name__, "Nt": Nt}, r))
+    return res
+
+
+def bench_solve(Nt, Nz, nSkip):
+    res = []
+    for solver in SOLVERS:
+        my_solver, u0 = setup(Nt, Nz, solver, nSkip=nSkip)
+        r = measure(lambda: my_solver.solve(u0), nRep=3)
+        if "t_min" in r:
+            r["steps_per_s"] = Nz / r["t_min"]
+        res.append(("solve", {"solver": solver.__name__, "Nt": Nt, "Nz": Nz, "nSkip": nSkip}, r))
+    return res
+
+
+def bench_utz(Nt, nSnapshots):
+    my_solver, u0 = setup(Nt, nSnapshots - 1, Symmetric_Split_Step_Solver)
+    my_solver.solve(u0)
+    # -- utzView TRANSFORMS THE FULL HISTORY ON EVERY ACCESS (NO CACHING)
+    r = measure(lambda: my_solver.utzView[:])
+    return [("utz", {"Nt": Nt, "n_snapshots": nSnapshots}, r)]
+
+
+def bench_spectrogram(Nt, NtDelay, s0):
+    t = np.linspace(-40.0, 40.0, Nt, endpoint=False)
+    w = FTFREQ(t.size, d=t[1] - t[0]) * 2 * np.pi
+    ut = 1.0 / np.cosh(t) + 0.1 * np.exp(-10j * t) / np.cosh((t - 10.0) / 2.0)
+    r = measure(lambda: spectrogram(t, w, ut, Nt=NtDelay, s0=s0), nRep=3)
+    return [("spectrogram", {"Nt": Nt, "Nt_delay": NtDelay, "s0": s0}, r)]
+
+
+def bench_prop_const(Nt):
+    pc = prop_const(0.0, 0.0, -1.0, 0.1, 0.0)
+    w = np.linspace(-20.0, 20.0, Nt)
+    return [
+        ("beta1", {"Nt": Nt}, measure(lambda: pc.beta1(w))),
+        ("beta2", {"Nt": Nt}, measure(lambda: pc.beta2(w))),
+    ]
+
+
+def compare(res, baseline, threshold):
+    """Report cases that are slower than in the baseline.
+
+    Returns:
+        :obj:`int`: Number of regressions.
+    """
+    key = lambda case: (case["name"], json.dumps(case["params"], sort_keys=True))
+    ref = {key(case): case for case in baseline["cases"] if "t_min" in case}
+    nReg = 0
+    for case in res["cases"]:
+        if "t_min" not in case or key(case) not in ref:
+            continue
+        ratio = case["t_min"] / ref[key(case)]["t_min"]
+        flag = "REGRESSION" if ratio > threshold else ""
+        nReg += bool(flag)
+        print("# %-12s %-60s %6.2f %s" % (case["name"], key(case)[1], ratio, flag))
+    return nReg
+
+
+def main():
+    parser = argparse.ArgumentParser(description="gnse throughput and memory benchmarks")
+    parser.add_argument("--backend", default=None, help="FFT backend (numpy, scipy, pyfftw)")
+    parser.add_argument("--workers", type=int, default=None, help="FFT threads")
+    parser.add_argument("--kernel", default=None, help="nonlinear kernel backend (numpy, numexpr, numba)")
+    parser.add_argument("--quick", action="store_true", help="reduced problem sizes")
+    parser.add_argument("-o", "--output", default=None, help="output file (json)")
+    parser.add_argument("--compare", default=None, help="baseline file (json)")
+    parser.add_argument("--threshold", type=float, default=1.2, help="regression threshold")
+    args = parser.parse_args()
+
+    if args.backend:
+        kwargs = {} if args.workers is None else {"workers": args.workers}
+        set_fft_backend(args.backend, **kwargs)
+    backend = type(get_fft_backend()).__name__.strip("_")
+    if args.kernel:
+        set_kernel_backend(args.kernel)
+    kernel = type(get_kernel_backend()).__name__.strip("_")
+
+    # -- SET PROBLEM SIZES
+    if args.quick:
+        Nt_list, Nz_list, Nt_delay_list = [2**n for n in (10, 12)], [100], [100]
+    else:
+        Nt_list, Nz_list, Nt_delay_list = [2**n for n in range(10, 17, 2)], [100, 1000], [250, 1000]
+
+    # -- RUN BENCHMARKS
+    cases = []
+    jobs = []
+    for Nt in Nt_list:
+        jobs.append(lambda Nt=Nt: bench_singleStep(Nt))
+        jobs.append(lambda Nt=Nt: bench_utz(Nt, 100))
+        jobs.append(lambda Nt=Nt: bench_prop_const(Nt))
+        for Nz in Nz_list:
+            jobs.append(lambda Nt=Nt, Nz=Nz: bench_solve(Nt, Nz, nSkip=10))
+    for Nt in Nt_list[:3]:
+        for NtDelay in Nt_delay_list:
+            for s0 in (1.0, 20.0):
+                jobs.append(lambda Nt=Nt, NtDelay=NtDelay, s0=s0: bench_spectrogram(Nt, NtDelay, s0))
+    for job in jobs:
+        for name, params, r in job():
+            cases.append(dict(name=name, params=params, **r))
+            if "error" in r:
+                print("# %-12s %-60s %s" % (name, json.dumps(params), r["error"]))
+            else:
+                print("# %-12s %-60s %.3e s %10d B" % (name, json.dumps(params), r["t_min"], r["peak_bytes"]))
+
+    # -- SAVE RESULTS
+    res = {
+        "gnse": __version__,
+        "numpy": np.__version__,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "fft_backend": backend,
+        "kernel_backend": kernel,
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "cases": cases,
+    }
+    oName = args.output or "bench_%s.json" % (backend)
+    with open(oName, "w") as f:
+        json.dump(res, f, indent=1)
+
+    if args.compare:
+        with open(args.compare) as f:
+            sys.exit(compare(res, json.load(f), args.threshold) > 0)
+
+
+if __name__ == "__main__":
+    main()
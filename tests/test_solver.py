@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from gnse.config import FTFREQ
+from gnse.solver import Symmetric_Split_Step_Solver
+
+
+def _soliton(Nt=256, Nz=11, beta=-0.5, gamma=1.0, **kwargs):
+    t = np.linspace(-20, 20, Nt, endpoint=False)
+    w = FTFREQ(t.size, d=t[1] - t[0]) * 2 * np.pi
+    z = np.linspace(0, 1, Nz)
+    solver = Symmetric_Split_Step_Solver(z, t, beta * w ** 2, gamma, **kwargs)
+    return solver, 1 / np.cosh(t) + 0j
+
+
+def test_utz_read_by_callback():
+    solver, u0 = _soliton()
+    solver.solve(u0, callback=lambda z, uw: solver.utz)
+    assert solver.utz.shape == solver.uwz.shape == (11, 256)
+    ref, _ = _soliton()
+    ref.solve(u0)
+    np.testing.assert_allclose(solver.utz, ref.utz)
+    np.testing.assert_allclose(solver.utzView[-1], ref.utz[-1])
+
+
+def test_last_state_stored():
+    # -- 10 STEPS, nSkip NOT A DIVISOR
+    fixed, u0 = _soliton(nSkip=4)
+    fixed.solve(u0)
+    adaptive, _ = _soliton(nSkip=4, tol=1e-6)
+    adaptive.solve(u0)
+    for solver in (fixed, adaptive):
+        np.testing.assert_allclose(solver.z, [0.0, 0.4, 0.8, 1.0])
+        assert solver.uwz.shape == (4, 256)
+    np.testing.assert_allclose(adaptive.uwz[-1], fixed.uwz[-1], atol=1e-4)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        dict(Nz=21),
+        dict(beta=-0.4),
+        dict(gamma=0.9),
+        dict(dtype=np.complex64),
+    ],
+)
+def test_restart_rejects_other_configuration(tmp_path, kwargs):
+    path = str(tmp_path / "ckpt.pkl")
+    solver, u0 = _soliton()
+    solver.solve(u0, checkpoint=path, nCheckpoint=5)
+    other, _ = _soliton(**kwargs)
+    with pytest.raises(ValueError):
+        other.solve(restart=path)
+
+
+def test_restart_continues_run(tmp_path):
+    path = str(tmp_path / "ckpt.pkl")
+    solver, u0 = _soliton()
+    solver.solve(u0, checkpoint=path, nCheckpoint=5)
+    other, _ = _soliton()
+    other.solve(restart=path)
+    np.testing.assert_allclose(other.uwz[-1], solver.uwz[-1])
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+from gnse import config
+from gnse.config import FTFREQ
+from gnse.spectrogram import spectrogram
+
+
+@pytest.fixture(params=["numpy", "scipy", "pyfftw"])
+def fft_backend(request, tmp_path):
+    module = "scipy.fft" if request.param == "scipy" else request.param
+    pytest.importorskip(module)
+    kwargs = {}
+    if request.param == "pyfftw":
+        kwargs = dict(wisdom=str(tmp_path / "wisdom"), effort="FFTW_ESTIMATE")
+    previous = config.get_fft_backend()
+    yield config.set_fft_backend(request.param, **kwargs)
+    config._fft_backend = previous
+
+
+@pytest.mark.parametrize("cutoff", [None, 6.0])
+def test_workers_match_serial(fft_backend, cutoff):
+    t = np.linspace(-50, 50, 1024, endpoint=False)
+    w = FTFREQ(t.size, d=t[1] - t[0]) * 2 * np.pi
+    ut = np.exp(-(t ** 2) / 8 - 1j * t * (3 + 0.05 * t))
+    args = dict(Nt=200, s0=1.0, cutoff=cutoff, max_memory=2 ** 16)
+    P1 = spectrogram(t, w, ut, workers=1, **args)[2]
+    P4 = spectrogram(t, w, ut, workers=4, **args)[2]
+    np.testing.assert_allclose(P4, P1, rtol=0, atol=1e-12 * P1.max())